@@ -0,0 +1,190 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Bump these whenever extraction, the topic prompts or the shape of a cached
+# analysis change so stale analyses stop matching new uploads.
+EXTRACTION_VERSION = 4
+PROMPT_VERSION = 2
+ANALYSIS_VERSION = 11
+
+
+def content_key(digest, *parts):
+    """The upload's SHA-256 hex digest (ingest.upload_digest), namespaced by pipeline versions."""
+    prefix = "-".join(str(p) for p in (f"e{EXTRACTION_VERSION}", f"p{PROMPT_VERSION}", f"a{ANALYSIS_VERSION}") + parts)
+    return f"{prefix}-{digest}"
+
+
+class MemoryBackend:
+    """In-process LRU with per-entry TTL."""
+
+    def __init__(self, max_entries=128, ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires is not None and expires < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        expires = time.time() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class DiskBackend:
+    """JSON files in a directory, evicted by TTL and total size (oldest access first)."""
+
+    def __init__(self, directory, max_bytes=64 * 1024 * 1024, ttl=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("expires") is not None and entry["expires"] < time.time():
+            self.delete(key)
+            return None
+        try:
+            os.utime(path)  # mark as recently used for size eviction
+        except OSError:
+            pass
+        return entry.get("value")
+
+    def set(self, key, value):
+        expires = time.time() + self.ttl if self.ttl else None
+        path = self._path(key)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({"expires": expires, "value": value}, f)
+            os.replace(tmp, path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"⚠️ Cache write failed: {str(e)}")
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return
+        self._evict()
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith('.json'):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+    def _evict(self):
+        with self._lock:
+            entries = []
+            now = time.time()
+            for name in os.listdir(self.directory):
+                if not name.endswith('.json'):
+                    continue
+                path = os.path.join(self.directory, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                if self.ttl and st.st_mtime + self.ttl < now:
+                    # Not read within a TTL window, so it has expired too
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+
+
+class TieredCache:
+    """Looks up backends in order and back-fills faster tiers on a hit."""
+
+    def __init__(self, *backends):
+        self.backends = list(backends)
+
+    def get(self, key):
+        for i, backend in enumerate(self.backends):
+            value = backend.get(key)
+            if value is not None:
+                for faster in self.backends[:i]:
+                    faster.set(key, value)
+                return value
+        return None
+
+    def set(self, key, value):
+        for backend in self.backends:
+            backend.set(key, value)
+
+    def delete(self, key):
+        for backend in self.backends:
+            backend.delete(key)
+
+    def clear(self):
+        for backend in self.backends:
+            backend.clear()
+
+
+def build_analysis_cache(upload_folder):
+    """Memory LRU in front of a disk store under the upload folder, configured from env."""
+    if os.environ.get('ANALYSIS_CACHE', '1') == '0':
+        return None
+    ttl = int(os.environ.get('ANALYSIS_CACHE_TTL', 7 * 24 * 3600))
+    backends = [MemoryBackend(int(os.environ.get('ANALYSIS_CACHE_MAX_ENTRIES', 128)), ttl)]
+    try:
+        backends.append(DiskBackend(os.path.join(upload_folder, '.analysis_cache'),
+                                    int(os.environ.get('ANALYSIS_CACHE_MAX_BYTES', 64 * 1024 * 1024)),
+                                    ttl))
+    except OSError as e:
+        print(f"⚠️ Disk cache unavailable, using memory only: {str(e)}")
+    return TieredCache(*backends)
@@ -0,0 +1,88 @@
+import hashlib
+import json
+import os
+from functools import lru_cache
+
+from keywords import KeywordMatcher, get_classifier
+
+RESOURCES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'resources.json')
+
+# Links every topic gets: "{query}" is the topic with spaces as '+'
+RESOURCE_TEMPLATES = [
+    {"name": "YouTube Tutorial", "url": "https://www.youtube.com/results?search_query={query}+tutorial"},
+    {"name": "GeeksforGeeks", "url": "https://www.google.com/search?q={query}+geeksforgeeks"},
+    {"name": "Lecture Notes", "url": "https://www.google.com/search?q={query}+lecture+notes+pdf"},
+    {"name": "Interview Prep", "url": "https://www.google.com/search?q={query}+interview+questions"},
+    {"name": "Wikipedia", "url": "https://en.wikipedia.org/wiki/{query}"}
+]
+
+
+def normalize_topic(topic):
+    return " ".join(topic.lower().split())
+
+
+class Catalog:
+    """
+    The static part of topic details: mentor tips, link templates and curated links.
+
+    Tips and curated entries have ids, so responses can reference them and ship
+    the catalog once (/api/catalog, cached by ETag). lookup() results are memoized
+    per title in an LRU of `max_entries`, since the same titles recur across uploads.
+    """
+
+    def __init__(self, classifier, curated, templates=RESOURCE_TEMPLATES, max_entries=4096):
+        self.classifier = classifier
+        self.templates = list(templates)
+        self.tips = list(dict.fromkeys([*classifier.tips.values(), classifier.default_tip]))
+        self._tip_id = {tip: i for i, tip in enumerate(self.tips)}
+        self.curated = {entry["id"]: entry["links"] for entry in curated}
+        # A title matching several entries gets the first one in file order
+        phrases = {}
+        for rank, entry in enumerate(curated):
+            for phrase in entry.get("match", ()):
+                phrases.setdefault(phrase.lower(), (rank, entry["id"]))
+        self._matcher = KeywordMatcher(list(phrases))
+        self._phrase_entry = list(phrases.values())
+        self.lookup = lru_cache(maxsize=max_entries)(self._lookup)
+        payload = self.payload(include_version=False)
+        self.version = hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+    def resource_id(self, topic):
+        """Id of the curated entry for a title, or None."""
+        matches = [self._phrase_entry[i] for i in self._matcher.find(normalize_topic(topic))]
+        return min(matches)[1] if matches else None
+
+    def tip_id(self, tip):
+        return self._tip_id.get(tip, self._tip_id[self.classifier.default_tip])
+
+    def _lookup(self, topic):
+        """{"tip": tip id, "resource": curated id or None, "links": [...]}; shared, don't mutate."""
+        resource = self.resource_id(topic)
+        query = topic.replace(' ', '+')
+        links = self.curated.get(resource, []) + [
+            {"name": r["name"], "url": r["url"].replace("{query}", query)} for r in self.templates]
+        return {"tip": self.tip_id(self.classifier.classify(topic)["tip"]), "resource": resource, "links": links}
+
+    def payload(self, include_version=True):
+        """The /api/catalog body. Clients build a topic's links as curated[resource] + templates."""
+        payload = {"tips": self.tips, "templates": self.templates, "curated": self.curated}
+        if include_version:
+            payload["version"] = self.version
+        return payload
+
+
+def load_catalog(path, classifier, max_entries=4096):
+    """Catalog from a JSON file: {"resources": [{"id", "match": [phrases], "links": [{name, url}]}]}."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            curated = json.load(f).get("resources", [])
+    except FileNotFoundError:
+        curated = []
+    return Catalog(classifier, curated, max_entries=max_entries)
+
+
+@lru_cache(maxsize=None)
+def get_catalog():
+    """The shared catalog for RESOURCES_FILE (env override) and the keyword classifier."""
+    return load_catalog(os.environ.get('RESOURCES_FILE', RESOURCES_FILE), get_classifier(),
+                        int(os.environ.get('CATALOG_CACHE_MAX_ENTRIES', 4096)))
@@ -0,0 +1,151 @@
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from cache import MemoryBackend
+
+# Question scaffolding that doesn't change what is being asked. Words that carry the
+# intent ("why", "how", "example", "simple", "define", ...) are content, not scaffolding.
+STOPWORDS = frozenset("""
+a an the is are was were be been am do does did can could would should will shall may might
+what whats please pls explain describe tell me us i you we it its this that these those
+of in on at to for from by with about into and or give show help understand
+""".split())
+# Spellings of the same intent share one token
+INTENT_SYNONYMS = {
+    "definition": "define", "meaning": "define", "mean": "define", "means": "define",
+    "examples": "example", "simply": "simple", "simpler": "simple",
+}
+# "what is A* search", "explain A star": asking about the topic itself means defining it
+DEFINE_LEADS = frozenset(["what", "whats", "explain", "describe", "tell"])
+_SUFFIXES = ("ing", "ed", "s")
+_TOKEN = re.compile(r"\w+")
+
+
+def _words(text):
+    """Case-folded words; 'A*' reads as 'a star' so both spellings agree."""
+    return _TOKEN.findall(text.casefold().replace('*', ' star '))
+
+
+def question_tokens(text):
+    """Case-folded content words, intent synonyms merged."""
+    return frozenset(INTENT_SYNONYMS.get(t, t) for t in _words(text) if t not in STOPWORDS)
+
+
+def stem(token):
+    """Crude suffix stripping, enough to let "sorting" / "sort" or "graphs" / "graph" agree."""
+    for suffix in _SUFFIXES:
+        if len(token) > len(suffix) + 2 and token.endswith(suffix) and not token.endswith("ss"):
+            return token[:-len(suffix)]
+    return token
+
+
+def content_tokens(topic, question):
+    """
+    Question words minus the topic's own words (by stem), which the topic key already covers.
+    A question that only names the topic after "what is" / "explain" / "describe"
+    is a definition request and reduces to {"define"}.
+    """
+    topic_stems = frozenset(stem(t) for t in question_tokens(topic))
+    words = _words(question)
+    tokens = frozenset(INTENT_SYNONYMS.get(t, t) for t in words
+                       if t not in STOPWORDS and stem(t) not in topic_stems)
+    if not tokens and DEFINE_LEADS.intersection(words) and topic_stems.intersection(map(stem, words)):
+        return frozenset(["define"])
+    return tokens
+
+
+def exact_key(topic, tokens):
+    """Same topic + same set of content words -> same key, whatever the word order."""
+    raw = topic.casefold().strip() + "\x00" + " ".join(sorted(tokens))
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+class ChatCache:
+    """
+    Mentor answers keyed on (topic, normalized question).
+    Exact lookups hash the content-word set, so "define A* search", "meaning of A star"
+    and "what is A* search" share an entry under topic "A* Search". Near-duplicates are
+    inflections of a cached question: a small per-topic index maps the stemmed word set
+    to its entry, so "merge sorting" finds "merge sort" but "bfs vs ucs" never gets
+    "bfs vs dfs". Questions with no content words left ("what is it?", "how does it work?") are never
+    cached: too many different questions would share their key.
+    Answers live in an LRU with TTL; stats() reports hit rates.
+    """
+
+    def __init__(self, max_entries=1024, ttl=None, near=True, per_topic=256):
+        self.answers = MemoryBackend(max_entries, ttl)
+        self.near = near
+        self.per_topic = per_topic
+        self._stems = {}  # topic -> OrderedDict(stemmed word set -> key)
+        self._lock = threading.Lock()
+        self._stats = {"exact_hits": 0, "near_hits": 0, "misses": 0, "stores": 0}
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def get(self, topic, question):
+        tokens = content_tokens(topic, question)
+        if not tokens:
+            self._count("misses")
+            return None
+        key = exact_key(topic, tokens)
+        answer = self.answers.get(key)
+        if answer is not None:
+            self._count("exact_hits")
+            return answer
+        if self.near:
+            answer = self._near(topic.casefold().strip(), tokens)
+            if answer is not None:
+                self._count("near_hits")
+                return answer
+        self._count("misses")
+        return None
+
+    def _near(self, topic, tokens):
+        stems = frozenset(stem(t) for t in tokens)
+        with self._lock:
+            key = self._stems.get(topic, {}).get(stems)
+        if key is None:
+            return None
+        answer = self.answers.get(key)
+        if answer is None:
+            # Evicted or expired from the LRU; drop it from the index too
+            with self._lock:
+                self._stems.get(topic, {}).pop(stems, None)
+        return answer
+
+    def set(self, topic, question, answer):
+        tokens = content_tokens(topic, question)
+        if not tokens:
+            return
+        key = exact_key(topic, tokens)
+        self.answers.set(key, answer)
+        self._count("stores")
+        if self.near:
+            stems = frozenset(stem(t) for t in tokens)
+            with self._lock:
+                index = self._stems.setdefault(topic.casefold().strip(), OrderedDict())
+                index[stems] = key
+                index.move_to_end(stems)
+                while len(index) > self.per_topic:
+                    index.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["exact_hits"] + stats["near_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["exact_hits"] + stats["near_hits"]) / lookups if lookups else 0.0
+        return stats
+
+
+def build_chat_cache():
+    """Chat answer cache configured from env (CHAT_CACHE=0 disables it)."""
+    if os.environ.get('CHAT_CACHE', '1') == '0':
+        return None
+    return ChatCache(max_entries=int(os.environ.get('CHAT_CACHE_MAX_ENTRIES', 1024)),
+                     ttl=int(os.environ.get('CHAT_CACHE_TTL', 24 * 3600)),
+                     near=os.environ.get('CHAT_CACHE_NEAR', '1') != '0')
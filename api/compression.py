@@ -0,0 +1,36 @@
+import gzip
+
+# brotli is optional (pip install brotli); gzip is always available
+_brotli = None
+_brotli_checked = False
+
+COMPRESSIBLE_TYPES = ("application/json", "text/plain", "text/html")
+
+
+def _brotli_module():
+    global _brotli, _brotli_checked
+    if not _brotli_checked:
+        try:
+            import brotli
+            _brotli = brotli
+        except ImportError:
+            _brotli = None
+        _brotli_checked = True
+    return _brotli
+
+
+def choose_encoding(accept_encodings):
+    """Best of br / gzip the client accepts (werkzeug's request.accept_encodings), or None."""
+    brotli = _brotli_module()
+    if brotli is not None and accept_encodings['br'] > 0 and accept_encodings['br'] >= accept_encodings['gzip']:
+        return "br"
+    if accept_encodings['gzip'] > 0:
+        return "gzip"
+    return None
+
+
+def compress(body, encoding):
+    if encoding == "br":
+        return _brotli_module().compress(body, quality=5)
+    # Level 6 is gzip's default trade-off; mtime=0 keeps the bytes stable for ETags
+    return gzip.compress(body, compresslevel=6, mtime=0)
@@ -0,0 +1,308 @@
+import heapq
+import math
+import os
+import re
+from collections import defaultdict
+
+_TOKEN = re.compile(r'\w+')
+
+# numpy + scipy are optional (pip install numpy scipy): with them the similarity
+# search is a sparse matrix product, without them the same scores come from an
+# inverted index in pure Python
+_numeric = None
+_numeric_checked = False
+
+# Character n-gram length; n-grams tie together inflections and compounds
+# ("Sorting" / "Sort algorithms", "Networks" / "Neural network") that share no whole word
+NGRAM = 3
+# Features found in more than this share of a large syllabus ("ion", "ing", "introduction")
+# carry almost no weight but dominate the pair count, so they are left out of scoring
+MAX_DF = 0.1
+MAX_DF_FLOOR = 50
+# Function words and syllabus boilerplate that make unrelated titles look alike
+# ("Introduction to Search" / "Introduction to Machine Learning", "Search algorithms" /
+# "Backpropagation algorithm"). A typical syllabus is far below MAX_DF_FLOOR topics,
+# so the document-frequency cut can't catch these words there
+STOP_WORDS = frozenset("""
+a an and as at by for from in into of on or the to with vs via
+introduction intro overview basics basic fundamentals fundamental concepts concept
+principles topics advanced applications chapter unit module part lecture week
+algorithm algorithms method methods technique techniques approach approaches
+system systems model models problem problems type types theory generic general
+""".split())
+# Rows of the similarity matrix materialized at a time
+BLOCK_ROWS = 512
+
+
+def _numeric_modules():
+    global _numeric, _numeric_checked
+    if not _numeric_checked:
+        try:
+            import numpy
+            import scipy.sparse
+            _numeric = (numpy, scipy.sparse)
+        except ImportError:
+            _numeric = None
+        _numeric_checked = True
+    return _numeric
+
+
+def topic_features(topic):
+    """Term counts for a title: each word, plus the character n-grams of the padded word."""
+    counts = defaultdict(int)
+    for word in _TOKEN.findall(topic.lower()):
+        if word in STOP_WORDS or word.isdigit():
+            continue
+        counts[word] += 1
+        padded = f"<{word}>"
+        for k in range(len(padded) - NGRAM + 1):
+            counts["#" + padded[k:k + NGRAM]] += 1
+    return counts
+
+
+def tfidf_vectors(topics):
+    """
+    L2-normalized TF-IDF vectors as {feature id: weight} dicts, with smoothed idf
+    (log((1 + n) / (1 + df)) + 1). Returns (vectors, number of features).
+    """
+    n = len(topics)
+    counts = [topic_features(t) for t in topics]
+    df = defaultdict(int)
+    for c in counts:
+        for feature in c:
+            df[feature] += 1
+    max_df = max(MAX_DF * n, MAX_DF_FLOOR)
+    vocabulary = {}
+    idf = []
+    for feature, d in df.items():
+        if d <= max_df:
+            vocabulary[feature] = len(idf)
+            idf.append(math.log((1 + n) / (1 + d)) + 1)
+    vectors = []
+    for c in counts:
+        weights = {vocabulary[f]: tf * idf[vocabulary[f]] for f, tf in c.items() if f in vocabulary}
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        vectors.append({f: w / norm for f, w in weights.items()})
+    return vectors, len(idf)
+
+
+def _top_k(scored, k, threshold):
+    """The k best (score, j) pairs at or above threshold; ties go to the earlier topic."""
+    best = sorted(((round(score, 9), j) for j, score in scored if score >= threshold - 1e-9),
+                  key=lambda p: (-p[0], p[1]))
+    return [j for _, j in best[:k]]
+
+
+def _neighbors_python(vectors, k, threshold):
+    postings = defaultdict(list)
+    for i, vec in enumerate(vectors):
+        for f, w in vec.items():
+            postings[f].append((i, w))
+    neighbors = []
+    for i, vec in enumerate(vectors):
+        scores = defaultdict(float)
+        for f, w in vec.items():
+            for j, wj in postings[f]:
+                scores[j] += w * wj
+        scores.pop(i, None)
+        neighbors.append(_top_k(scores.items(), k, threshold))
+    return neighbors
+
+
+def _neighbors_sparse(vectors, n_features, k, threshold):
+    np, sparse = _numeric
+    indptr, indices, data = [0], [], []
+    for vec in vectors:
+        indices.extend(vec)
+        data.extend(vec.values())
+        indptr.append(len(indices))
+    matrix = sparse.csr_matrix((data, indices, indptr), shape=(len(vectors), n_features))
+    transposed = matrix.T.tocsc()
+    neighbors = []
+    for start in range(0, len(vectors), BLOCK_ROWS):
+        block = (matrix[start:start + BLOCK_ROWS] @ transposed).tocsr()
+        block.data[block.data < threshold - 1e-9] = 0.0
+        block.eliminate_zeros()
+        for row in range(block.shape[0]):
+            lo, hi = block.indptr[row], block.indptr[row + 1]
+            columns, scores = block.indices[lo:hi], block.data[lo:hi]
+            keep = columns != start + row
+            columns, scores = columns[keep], scores[keep]
+            if len(scores) > k:
+                # Only the k best (plus anything tied with the k-th) are sorted
+                kth = np.partition(scores, -k)[-k]
+                keep = scores >= kth - 1e-9
+                columns, scores = columns[keep], scores[keep]
+            neighbors.append(_top_k(zip(columns.tolist(), scores.tolist()), k, threshold))
+    return neighbors
+
+
+def similar_topics(topics, k=5, threshold=0.2):
+    """
+    For each topic, up to k other topics with TF-IDF cosine similarity >= threshold,
+    most similar first. Only these top-k lists are ever kept, never the full matrix.
+    DEPENDENCY_VECTORS=python forces the pure-Python path.
+    """
+    if not topics:
+        return []
+    vectors, n_features = tfidf_vectors(topics)
+    if os.environ.get('DEPENDENCY_VECTORS') != 'python' and _numeric_modules() is not None:
+        return _neighbors_sparse(vectors, n_features, k, threshold)
+    return _neighbors_python(vectors, k, threshold)
+
+
+def dependency_adjacency(topics, threshold=0.2, sequential=True, difficulty=None, top_k=5):
+    """
+    Builds the dependency graph as adjacency arrays: adjacency[i] lists the indices
+    of the topics that topic i leads to.
+    1. Each topic is linked to its `top_k` most similar topics (TF-IDF over words and
+       character n-grams, cosine >= `threshold`), earlier topic -> later topic.
+       With `difficulty` (1-3 per topic), a pair whose later topic is easier is not a
+       prerequisite in syllabus order: without `sequential` it is reversed (the easier
+       topic comes first), with it the pair is dropped, since the chain already
+       commits to syllabus order and a reversed edge could only form a cycle.
+    2. With `sequential`, topic N is also assumed to be a prerequisite for N+1.
+    """
+    n = len(topics)
+    edges = [set() for _ in range(n)]
+    for i, similar in enumerate(similar_topics(topics, top_k, threshold)):
+        for j in similar:
+            src, dst = min(i, j), max(i, j)
+            if difficulty is not None and difficulty[src] > difficulty[dst]:
+                if sequential:
+                    continue
+                src, dst = dst, src
+            edges[src].add(dst)
+    if sequential:
+        for i in range(n - 1):
+            edges[i].add(i + 1)
+    return [sorted(e) for e in edges]
+
+
+def analyze_dependencies(topics, threshold=0.2, sequential=True, difficulty=None, top_k=5):
+    """dependency_adjacency as a dict of topic -> list of dependent topics."""
+    adjacency = dependency_adjacency(topics, threshold, sequential, difficulty, top_k)
+    graph = {topic: [] for topic in topics}
+    for i, edges in enumerate(adjacency):
+        graph[topics[i]].extend(topics[j] for j in edges)
+    return graph
+
+
+def to_adjacency(graph):
+    """(nodes, adjacency arrays) for a dict graph; edges to unknown nodes are dropped."""
+    nodes = list(graph)
+    index = {node: i for i, node in enumerate(nodes)}
+    return nodes, [[index[v] for v in graph[u] if v in index] for u in nodes]
+
+
+def strongly_connected_components(adjacency):
+    """
+    Tarjan's algorithm over adjacency arrays, iterative so deep chains don't hit
+    the recursion limit. Returns components as lists of node indices.
+    """
+    n = len(adjacency)
+    index_of = [-1] * n
+    lowlink = [0] * n
+    on_stack = [False] * n
+    stack = []
+    components = []
+    counter = 0
+
+    for root in range(n):
+        if index_of[root] != -1:
+            continue
+        index_of[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [(root, iter(adjacency[root]))]
+        while work:
+            node, neighbors = work[-1]
+            advanced = False
+            for neighbor in neighbors:
+                if index_of[neighbor] == -1:
+                    index_of[neighbor] = lowlink[neighbor] = counter
+                    counter += 1
+                    stack.append(neighbor)
+                    on_stack[neighbor] = True
+                    work.append((neighbor, iter(adjacency[neighbor])))
+                    advanced = True
+                    break
+                if on_stack[neighbor] and index_of[neighbor] < lowlink[node]:
+                    lowlink[node] = index_of[neighbor]
+            if advanced:
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                if lowlink[node] < lowlink[parent]:
+                    lowlink[parent] = lowlink[node]
+            if lowlink[node] == index_of[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+    return components
+
+
+def study_order(adjacency):
+    """
+    Topological order in O((V + E) log V) over adjacency arrays, tolerant of cycles.
+
+    Strongly connected components are condensed into single nodes and the
+    condensed DAG is ordered with Kahn's algorithm, taking the ready component with
+    the smallest syllabus index first (a min-heap). That is the valid order closest
+    to the syllabus: topics are only moved later to follow a dependency, so a graph
+    whose edges all point forward comes back in syllabus order.
+    Topics inside a cycle are emitted by their position in the syllabus.
+
+    Returns (order, cycles) as node indices, where cycles lists each component that
+    loops back on itself (including self-dependencies), members in syllabus order.
+    """
+    component_of = [0] * len(adjacency)
+    members = []
+    for comp_id, component in enumerate(sorted(strongly_connected_components(adjacency), key=min)):
+        component.sort()
+        members.append(component)
+        for node in component:
+            component_of[node] = comp_id
+
+    cycles = [c for c in members if len(c) > 1 or c[0] in adjacency[c[0]]]
+
+    # Components are numbered by their first topic, so the heap pops in syllabus order
+    in_degree = [0] * len(members)
+    out_edges = [[] for _ in members]
+    for node, edges in enumerate(adjacency):
+        src = component_of[node]
+        for neighbor in edges:
+            dst = component_of[neighbor]
+            if dst != src:
+                out_edges[src].append(dst)
+                in_degree[dst] += 1
+
+    ready = [c for c in range(len(members)) if in_degree[c] == 0]
+    heapq.heapify(ready)
+    order = []
+    while ready:
+        comp = heapq.heappop(ready)
+        order.extend(members[comp])
+        for dst in out_edges[comp]:
+            in_degree[dst] -= 1
+            if in_degree[dst] == 0:
+                heapq.heappush(ready, dst)
+    return order, cycles
+
+
+def find_study_order(graph):
+    """study_order for a dict graph: (order, cycles) as topics."""
+    nodes, adjacency = to_adjacency(graph)
+    order, cycles = study_order(adjacency)
+    return [nodes[i] for i in order], [[nodes[i] for i in c] for c in cycles]
+
+
+def get_study_order(graph):
+    return find_study_order(graph)[0]
@@ -0,0 +1,681 @@
+"""
+StudyFlow engine: the analyze pipeline (extract -> topics -> dependencies -> order ->
+classify -> schedule) and mentor chat behind one StudyPlanPipeline object.
+
+index.py only does HTTP. Heavy dependencies are imported on the paths that use them:
+pypdf on the first PDF extraction, google.generativeai on the first Gemini call.
+"""
+import os
+import re
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from cache import build_analysis_cache, content_key
+from store import build_store
+from ingest import read_text, upload_digest
+from chat_cache import build_chat_cache
+import extraction
+import gemini
+import metrics
+from normalizer import TopicNormalizer, topic_lines
+from outline import build_outline, outline_topics, attach_topics
+from dependencies import analyze_dependencies, dependency_adjacency, get_study_order, study_order
+from scheduler import build_schedule
+from keywords import get_classifier
+from catalog import get_catalog
+
+# ==========================================
+# 🤖 GEMINI CONFIGURATION
+# ==========================================
+def get_gemini():
+    """Process-wide Gemini model, created once per worker (see gemini.py)"""
+    return gemini.get_gemini()
+
+# ==========================================
+# 📄 TEXT & TOPICS
+# ==========================================
+
+# Only the head of the document reaches the topic prompt. The whole PDF is still
+# extracted, since the outline and unit spans cover every unit; PDF_MAX_CHARS (0 = no
+# limit) caps extraction for deployments that would rather cut very long course packs
+PROMPT_TEXT_CHARS = 8000
+PDF_MAX_CHARS = int(os.environ.get('PDF_MAX_CHARS', 0)) or None
+
+def extract_text_from_pdf(source, max_chars=None):
+    try:
+        return extraction.extract_text_from_pdf(source, max_chars=max_chars)
+    except Exception as e:
+        print(f"Error extracting PDF: {str(e)}")
+    return ""
+
+def clean_text(text):
+    # Keep alphanumeric and basic punctuation
+    text = re.sub(r'[^\w\s\.,;:\-\(\)]', ' ', text)
+    # Collapse multiple spaces/tabs to single space (but NOT newlines)
+    text = re.sub(r'[ \t]+', ' ', text)
+    # Collapse multiple newlines to single newline
+    text = re.sub(r'\n+', '\n', text)
+    return text.strip()
+
+def identify_topics(text):
+    """Uses Gemini API with fallback to regex"""
+    return identify_topics_with_source(text)[0]
+
+# "single": one structured call returns {subject, topics}; "two_call": subject first, then topics
+TOPIC_EXTRACTION_MODE = os.environ.get('TOPIC_EXTRACTION_MODE', 'single')
+# Strip the detected subject name out of topic titles (switchable for comparing modes)
+STRIP_SUBJECT = os.environ.get('STRIP_SUBJECT', '1') != '0'
+TOPIC_JSON_RETRIES = int(os.environ.get('TOPIC_JSON_RETRIES', 1))
+
+TOPIC_RULES = """
+            GOAL: Break down every Unit/Chapter/Section into at least 4-6 specific technical sub-topics. 
+            Aim for at least 25-30 distinct conceptual topics in total.
+            
+            Rules:
+            1. DO NOT return Unit/Chapter headers (e.g., skip "Unit 1", "Module 2").
+            2. Extract specific concepts (e.g., "A* Search Algorithm", "Backpropagation", "Gradient Descent").
+            3. STRIP {subject} and words like "Notes", "Syllabus", "Question Bank", "Important", "Part" from every topic.
+            4. Remove all Roman numerals (I, II, III, IV, V...), numbering (1.1, 2.3...), and labels like "UNIT" or "TOPIC".
+            5. Each topic should be 2-5 words."""
+
+def parse_topic_payload(raw):
+    """Validates a {"subject": str, "topics": [str, ...]} reply. Raises ValueError when malformed."""
+    raw = raw.replace('```json', '').replace('```', '').strip()
+    start, end = raw.find('{'), raw.rfind('}') + 1
+    if start == -1 or end == 0:
+        raise ValueError("no JSON object in reply")
+    payload = json.loads(raw[start:end])
+    if not isinstance(payload, dict):
+        raise ValueError("reply is not a JSON object")
+    subject = payload.get("subject", "")
+    topics = payload.get("topics")
+    if not isinstance(subject, str):
+        raise ValueError("subject must be a string")
+    if not isinstance(topics, list) or not topics or not all(isinstance(t, str) for t in topics):
+        raise ValueError("topics must be a non-empty list of strings")
+    return subject.strip().lower(), topics
+
+def topics_single_call(model, text):
+    """Subject and topics in one structured request, re-asking when the JSON doesn't validate."""
+    prompt = f"""
+            Identify the main subject of the text (2 words max) and extract a COMPREHENSIVE and DETAILED list of learning topics from it.
+            {TOPIC_RULES.format(subject="the subject name")}
+            6. Return ONLY a JSON object: {{"subject": "<subject>", "topics": ["<topic>", ...]}}
+            
+            Text:
+            {text[:PROMPT_TEXT_CHARS]}
+            """
+    error = None
+    for attempt in range(TOPIC_JSON_RETRIES + 1):
+        if error:
+            print(f"⚠️ Malformed topic JSON ({error}), retrying...")
+        response = model.generate_content(
+            prompt if not error else f"{prompt}\nYour previous reply was invalid ({error}). Reply with the JSON object only.",
+            generation_config={"response_mime_type": "application/json"})
+        try:
+            return parse_topic_payload(response.text)
+        except ValueError as e:  # json.JSONDecodeError is a ValueError
+            error = str(e)
+    raise ValueError(f"no valid topic JSON after {TOPIC_JSON_RETRIES + 1} attempts: {error}")
+
+def topics_two_call(model, text):
+    """Original flow: detect the subject, then embed it in the topic prompt."""
+    subject_name = ""
+    try:
+        sub_res = model.generate_content(f"Identify the main subject name from this text in 2 words max. Text: {text[:400]}")
+        subject_name = sub_res.text.strip().lower()
+    except: pass
+
+    prompt = f"""
+            Extract a COMPREHENSIVE and DETAILED list of learning topics from the text provided.
+            {TOPIC_RULES.format(subject=f'the subject name "{subject_name}"')}
+            6. Return ONLY a JSON array of strings.
+            
+            Text:
+            {text[:PROMPT_TEXT_CHARS]}
+            """
+    response = model.generate_content(prompt)
+    raw = response.text.replace('```json', '').replace('```', '').strip()
+    
+    # Extract JSON array
+    start = raw.find('[')
+    end = raw.rfind(']') + 1
+    if start != -1 and end != 0:
+        topics = json.loads(raw[start:end])
+        if isinstance(topics, list) and len(topics) > 0:
+            return subject_name, topics
+    return subject_name, []
+
+def identify_topics_with_source(text, outline=None):
+    """
+    Same as identify_topics, also reporting which path produced the list ("gemini" or "fallback").
+    The fallback takes the topics of `outline` (see outline.build_outline) when it has any.
+    """
+    model = get_gemini()
+    if model:
+        try:
+            if TOPIC_EXTRACTION_MODE == 'two_call':
+                subject_name, topics = topics_two_call(model, text)
+            else:
+                subject_name, topics = topics_single_call(model, text)
+            if topics:
+                normalizer = TopicNormalizer(subject_name if STRIP_SUBJECT else "")
+                return normalizer.normalize(topics), "gemini"
+            metrics.increment("studyflow_fallbacks_total", kind="topics", reason="empty")
+        except gemini.LLMBusy as e:
+            # Too many calls queued: answer now from the local extractor rather than late
+            print(f"⏳ Gemini busy, using fallback topics: {str(e)}")
+            metrics.increment("studyflow_fallbacks_total", kind="topics", reason="busy")
+        except Exception as e:
+            print(f"Gemini topic extraction failed: {str(e)}")
+            metrics.increment("studyflow_fallbacks_total", kind="topics", reason="llm_error")
+    else:
+        metrics.increment("studyflow_fallbacks_total", kind="topics", reason="no_model")
+            
+    # Enhanced Fallback: the outlined topics, else heading-like lines cleaned the same way as model output
+    topics = outline_topics(outline if outline is not None else build_outline(text))
+    if topics:
+        return topics, "fallback"
+    normalizer = TopicNormalizer(drop_chatter=False, min_length=3)
+    return normalizer.normalize(topic_lines(text)), "fallback"
+
+# Per-unit expansion: subtopics for one unit's text, asked for only when a client opens the unit
+UNIT_EXPAND_WORKERS = int(os.environ.get('UNIT_EXPAND_WORKERS', 4))
+
+def parse_unit_payload(raw):
+    """Validates a {"topics": [{"title": str, "subtopics": [str, ...]}, ...]} reply. Raises ValueError."""
+    raw = raw.replace('```json', '').replace('```', '').strip()
+    start, end = raw.find('{'), raw.rfind('}') + 1
+    if start == -1 or end == 0:
+        raise ValueError("no JSON object in reply")
+    payload = json.loads(raw[start:end])
+    topics = payload.get("topics") if isinstance(payload, dict) else None
+    if not isinstance(topics, list) or not topics:
+        raise ValueError("topics must be a non-empty list")
+    for t in topics:
+        if not isinstance(t, dict) or not isinstance(t.get("title"), str):
+            raise ValueError("each topic needs a string title")
+        if not isinstance(t.get("subtopics", []), list) or not all(isinstance(x, str) for x in t.get("subtopics", [])):
+            raise ValueError("subtopics must be a list of strings")
+    return topics
+
+def unit_topics_llm(model, title, text):
+    """Topics with subtopics for one unit, in one structured call."""
+    prompt = f"""
+            The text below is the unit "{title}" of a course syllabus.
+            List its learning topics in order, each with 2-6 specific sub-topics.
+            {TOPIC_RULES.format(subject="the subject name")}
+            6. Return ONLY a JSON object: {{"topics": [{{"title": "<topic>", "subtopics": ["<subtopic>", ...]}}, ...]}}
+            
+            Text:
+            {text[:PROMPT_TEXT_CHARS]}
+            """
+    response = model.generate_content(prompt, generation_config={"response_mime_type": "application/json"})
+    normalizer = TopicNormalizer()
+    topics = []
+    for t in parse_unit_payload(response.text):
+        title = normalizer.clean(t["title"])
+        if title:
+            topics.append({"title": title, "subtopics": normalizer.normalize(t.get("subtopics", []))})
+    return topics
+
+# ==========================================
+# ⚙️ CLASSIFY & SCHEDULE
+# ==========================================
+
+# Easy/hard vocabularies and mentor tips live in data/keywords.json (KEYWORDS_FILE)
+def get_mentor_advice(topic):
+    return get_classifier().classify(topic)["tip"]
+
+# Tips, link templates and curated links are served once from /api/catalog (see catalog.py)
+def get_resource_links(topic):
+    return get_catalog().lookup(topic)["links"]
+
+def classify_topics_fully(ordered_topics):
+    """Difficulty, mentor tip, matched keywords and resource links per topic, in one keyword scan."""
+    catalog = get_catalog()
+    topic_details = {}
+    for topic, match in zip(ordered_topics, get_classifier().classify_all(ordered_topics)):
+        topic_details[topic] = {
+            "difficulty": match["difficulty"],
+            "advice": match["tip"],
+            "keywords": match["keywords"],
+            "resources": catalog.lookup(topic)["links"]
+        }
+    return topic_details
+
+def generate_schedule(ordered_topics, topic_details, weeks, hours, level):
+    """Week list of the balanced, hours-capped plan (see scheduler.build_schedule for overflow)."""
+    return build_schedule(ordered_topics, topic_details, weeks, hours, level)["weeks"]
+
+# ==========================================
+# 💬 MENTOR CHAT
+# ==========================================
+
+def mentor_prompt(topic, message):
+    return f"""
+            You are a friendly and expert academic mentor. 
+            The student is studying "{topic}" and has a doubt.
+            
+            Student Question: "{message}"
+            
+            Provide a helpful, encouraging, and technically accurate response in 2-3 sentences.
+            If the question is unrelated to the topic, gently guide them back to studying.
+            """
+
+
+def fallback_chat_response(topic, user_message):
+    """Fallback chat responses without API"""
+    message_lower = user_message.lower()
+    
+    if any(word in message_lower for word in ["hello", "hi", "hey"]):
+        return f"Hi there! I'm ready to help you master {topic}. What's on your mind?"
+    
+    if any(word in message_lower for word in ["what is", "define", "explain", "understand"]):
+        return f"To understand {topic}, think of it as a way to solve problems systematically. It's often broken down into smaller, simpler steps. Check the resource links for detailed explanations!"
+        
+    if "example" in message_lower:
+        return f"A great example of {topic} is how modern systems solve real-world problems efficiently. The resources I've provided have excellent examples with visuals."
+
+    if any(word in message_lower for word in ["hard", "difficult", "confused", "stuck"]):
+        return f"Don't worry, {topic} can be challenging. I recommend starting with the YouTube tutorial I provided. Focus on understanding the basic concept first, then dive into details."
+
+    return f"That's a great question about {topic}! Check the GeeksforGeeks link in your resources for detailed examples and explanations. Practice problems really help solidify understanding."
+
+# ==========================================
+# 🧭 PIPELINE
+# ==========================================
+
+# DEPENDENCY_CHAIN=1 restores the old "topic N before topic N+1" edges; without them only
+# similar topics are linked and unrelated ones keep their syllabus order
+DEPENDENCY_CHAIN = os.environ.get('DEPENDENCY_CHAIN', '0') == '1'
+
+# Analysis ids are cache keys (see cache.content_key); anything else never reaches the disk tier
+ANALYSIS_ID = re.compile(r'[A-Za-z0-9-]{1,200}')
+
+def topics_from_payload(data):
+    """
+    (ordered topics, topic details) from a client-sent {"topics", "topic_details"} as
+    returned by /api/analyze. Topics without a difficulty count as medium.
+    Raises ValueError when the shape is wrong.
+    """
+    topics = data.get("topics")
+    details = data.get("topic_details") or {}
+    if not isinstance(topics, list) or not all(isinstance(t, str) for t in topics):
+        raise ValueError("topics must be a list of strings")
+    if not isinstance(details, dict):
+        raise ValueError("topic_details must be an object keyed by topic")
+    normalized = {}
+    for t in topics:
+        detail = details.get(t)
+        difficulty = detail.get("difficulty", 2) if isinstance(detail, dict) else 2
+        if difficulty not in (1, 2, 3):
+            raise ValueError(f"difficulty of {t!r} must be 1, 2 or 3")
+        normalized[t] = {**(detail if isinstance(detail, dict) else {}), "difficulty": difficulty}
+    return topics, normalized
+
+def mentor_summary(schedule, overflow, hours):
+    summary = f"I've analyzed your content and created a {len(schedule)}-week strategic roadmap!"
+    if overflow:
+        summary += (f" {len(overflow['topics'])} topics (~{overflow['hours']:g}h) don't fit in {hours}h/week;"
+                    f" plan {overflow['extra_weeks']} more week(s) or raise your weekly hours.")
+    return summary
+
+def compact_plan(analysis, plan, cycle_of, summary):
+    """
+    The plan with every topic written once. "topics" (study order) is the table the
+    other fields index into: per-topic "difficulty", "advice" (a tip id) and "resources"
+    (a curated entry id or null) from the /api/catalog of version "catalog", "keywords"
+    (indices into "vocabulary"), schedule and overflow topic indices, and
+    [source, target, in_cycle] links. The client builds resource links from the catalog.
+    """
+    catalog = get_catalog()
+    ordered_topics = analysis["ordered_topics"]
+    topic_details = analysis["topic_details"]
+    position = [0] * len(ordered_topics)
+    for rank, i in enumerate(analysis["order"]):
+        position[i] = rank
+    table = {t: rank for rank, t in enumerate(ordered_topics)}
+
+    vocabulary, word_index = [], {}
+    advice, resources, keywords = [], [], []
+    for t in ordered_topics:
+        entry = catalog.lookup(t)
+        advice.append(entry["tip"])
+        resources.append(entry["resource"])
+        for word in topic_details[t].get("keywords", ()):
+            if word not in word_index:
+                word_index[word] = len(vocabulary)
+                vocabulary.append(word)
+        keywords.append([word_index[w] for w in topic_details[t].get("keywords", ())])
+
+    overflow = plan["overflow"]
+    return {
+        "format": "compact",
+        "analysis_id": analysis.get("id"),
+        "topics": ordered_topics,
+        "difficulty": [topic_details[t]["difficulty"] for t in ordered_topics],
+        "advice": advice,
+        "resources": resources,
+        "catalog": catalog.version,
+        "keywords": keywords,
+        "vocabulary": vocabulary,
+        "schedule": [{**week, "topics": [table[t] for t in week["topics"]]} for week in plan["weeks"]],
+        "overflow": overflow and {**overflow, "topics": [table[t] for t in overflow["topics"]]},
+        "graph": {
+            "links": [[position[u], position[v], int(u in cycle_of and cycle_of[u] == cycle_of.get(v))]
+                      for u, edges in enumerate(analysis["adjacency"]) for v in edges],
+            "cycles": [[position[i] for i in cycle] for cycle in analysis["cycles"]],
+        },
+        "units": unit_skeleton(analysis, lambda i: position[i]),
+        "mentor_summary": summary,
+    }
+
+def unit_skeleton(analysis, topic_ref):
+    """
+    [{"id", "title", "topics"}] for an analysis, each topic as topic_ref(index into
+    analysis["topics"]). Subtopics are left to StudyPlanPipeline.expand_units.
+    """
+    units = analysis.get("units") or [{"title": "Course", "topics": range(len(analysis["topics"]))}]
+    return [{"id": k, "title": unit["title"], "topics": [topic_ref(i) for i in unit["topics"]]}
+            for k, unit in enumerate(units)]
+
+class StudyPlanPipeline:
+    """
+    The stable entry point for the API (and benchmarks / scripts):
+
+        pipeline = StudyPlanPipeline()
+        analysis = pipeline.analyze("syllabus.pdf", data)      # cached by content hash
+        plan = pipeline.plan(analysis, weeks=4, hours=10, level="Beginner")
+        reply = pipeline.chat("Search", "What is A*?")
+
+    `analysis_cache` / `chat_cache` are optional (None disables caching). With a
+    `store` (see store.py) every analysis that is cached is also persisted, and ids
+    that have left the cache are still found there.
+    """
+
+    def __init__(self, analysis_cache=None, chat_cache=None, store=None):
+        self.analysis_cache = analysis_cache
+        self.chat_cache = chat_cache
+        self.store = store
+
+    def analyze(self, filename, data, progress=None):
+        """
+        Extract, identify and order topics for an upload. Cached by content hash.
+        `data` is the raw bytes or a seekable binary stream (e.g. the spooled upload),
+        read in place without a copy on disk.
+        `progress(stage)` is called as each pipeline stage starts.
+        """
+        progress = progress or (lambda stage: None)
+        llm_mode = "llm" if os.environ.get('GEMINI_API_KEY') else "local"
+        is_pdf = filename.endswith('.pdf')
+        digest = upload_digest(data)
+        key = content_key(digest, "pdf" if is_pdf else "txt", llm_mode, TOPIC_EXTRACTION_MODE, int(STRIP_SUBJECT))
+        if self.analysis_cache:
+            cached = self.analysis_cache.get(key)
+            metrics.increment("studyflow_cache_requests_total", cache="analysis", result="hit" if cached else "miss")
+            if cached:
+                print("⚡ Analysis cache hit")
+                # Cached before the store existed (or was cleared): make its id durable too
+                self._persist(cached, digest, filename, replace=False)
+                return cached
+
+        print("📄 Extracting text...")
+        progress("extracting")
+        with metrics.span("extract"):
+            if is_pdf:
+                raw_text = extract_text_from_pdf(data, max_chars=PDF_MAX_CHARS)
+            else:
+                raw_text = read_text(data)
+        with metrics.span("clean_text"):
+            cleaned_text = clean_text(raw_text)
+
+        print("🤖 Identifying topics via Gemini...")
+        progress("identifying_topics")
+        with metrics.span("outline"):
+            outline = build_outline(cleaned_text)
+        with metrics.span("identify_topics"):
+            topics, source = identify_topics_with_source(cleaned_text, outline)
+        if not topics:
+            print("⚠️ No topics extracted, using fallback...")
+            topics = ["Introduction", "Core Concepts", "Advanced Modules", "Conclusion"]
+
+        # Graph nodes are indices into this list, so each title must appear once
+        topics = list(dict.fromkeys(topics))
+        # Units past the model's view of the document contribute their outlined topics
+        with metrics.span("units"):
+            topics, units = attach_topics(topics, outline, cleaned_text,
+                                          PROMPT_TEXT_CHARS if source == "gemini" else None)
+        progress("ordering")
+        # Difficulty directs the similarity edges, so topics are classified first
+        print("🏷️ Classifying topics...")
+        with metrics.span("classify"):
+            details = classify_topics_fully(topics)
+        print(f"📊 Analyzing dependencies for {len(topics)} topics...")
+        with metrics.span("dependencies"):
+            adjacency = dependency_adjacency(topics, sequential=DEPENDENCY_CHAIN,
+                                             difficulty=[details[t]["difficulty"] for t in topics])
+        with metrics.span("study_order"):
+            order, cycles = study_order(adjacency)
+        ordered_topics = [topics[i] for i in order]
+        topic_details = {t: details[t] for t in ordered_topics}
+        if cycles:
+            print(f"🔁 {len(cycles)} dependency cycle(s) found")
+
+        analysis = {
+            "id": key,
+            "text": cleaned_text,
+            "topics": topics,
+            "ordered_topics": ordered_topics,
+            "topic_details": topic_details,
+            "adjacency": adjacency,
+            "order": order,
+            "cycles": cycles,
+            "units": units,
+        }
+        # Don't pin a transient Gemini failure: only cache and persist results from the expected path
+        if source == "gemini" or llm_mode == "local":
+            if self.analysis_cache:
+                self.analysis_cache.set(key, analysis)
+            self._persist(analysis, digest, filename)
+        return analysis
+
+    def _persist(self, analysis, digest, filename, replace=True):
+        """Saves an analysis to the store, if any; a store failure never fails the upload."""
+        if not self.store:
+            return
+        try:
+            with metrics.span("store"):
+                self.store.save_analysis(analysis, digest, filename, replace=replace)
+        except Exception as e:
+            print(f"⚠️ Could not persist analysis: {str(e)}")
+
+    def plan(self, analysis, weeks, hours, level, compact=False):
+        """
+        Schedule + graph payload for an analysis; the only part that depends on the form fields.
+        `compact` selects the indexed format (see compact_plan).
+        """
+        topics = analysis["topics"]
+        adjacency = analysis["adjacency"]
+        ordered_topics = analysis["ordered_topics"]
+        topic_details = analysis["topic_details"]
+
+        print("📅 Generating schedule...")
+        with metrics.span("schedule"):
+            plan = build_schedule(ordered_topics, topic_details, weeks, hours, level)
+        schedule = plan["weeks"]
+
+        cycle_of = {n: i for i, cycle in enumerate(analysis["cycles"]) for n in cycle}
+        if compact:
+            return compact_plan(analysis, plan, cycle_of, mentor_summary(schedule, plan["overflow"], hours))
+
+        nodes = [{"id": t, "group": topic_details[t]["difficulty"]} for t in topics]
+        links = [{"source": topics[u], "target": topics[v],
+                  "cycle": u in cycle_of and cycle_of[u] == cycle_of.get(v)}
+                 for u, edges in enumerate(adjacency) for v in edges]
+        cycles = [[topics[i] for i in cycle] for cycle in analysis["cycles"]]
+
+        return {
+            "analysis_id": analysis.get("id"),
+            "topics": ordered_topics,
+            "topic_details": topic_details,
+            "schedule": schedule,
+            "overflow": plan["overflow"],
+            "graph": {"nodes": nodes, "links": links, "cycles": cycles},
+            "units": unit_skeleton(analysis, lambda i: topics[i]),
+            "mentor_summary": mentor_summary(schedule, plan["overflow"], hours)
+        }
+
+    def expand_unit(self, analysis, unit_id):
+        """
+        {"id", "title", "topics": [{"title", "subtopics"}], "source"} for one unit: Gemini
+        over the unit's text ("gemini", cached per analysis and unit), else its outline ("outline").
+        """
+        unit = analysis["units"][unit_id]
+        # "_" keeps unit entries out of reach of get_analysis (see ANALYSIS_ID)
+        key = f"{analysis['id']}_unit{unit_id}"
+        if self.analysis_cache:
+            cached = self.analysis_cache.get(key)
+            metrics.increment("studyflow_cache_requests_total", cache="unit", result="hit" if cached else "miss")
+            if cached:
+                return cached
+        result = {"id": unit_id, "title": unit["title"], "topics": unit["outline"], "source": "outline"}
+        model = get_gemini()
+        reason = "no_model"
+        if model and analysis.get("text"):
+            start, end = unit["span"]
+            try:
+                with metrics.span("expand_unit"):
+                    topics = unit_topics_llm(model, unit["title"], analysis["text"][start:end])
+                if topics:
+                    result = {**result, "topics": topics, "source": "gemini"}
+                    if self.analysis_cache:
+                        self.analysis_cache.set(key, result)
+                    return result
+                reason = "empty"
+            except gemini.LLMBusy:
+                reason = "busy"
+            except Exception as e:
+                print(f"Unit expansion failed: {str(e)}")
+                reason = "llm_error"
+        metrics.increment("studyflow_fallbacks_total", kind="unit", reason=reason)
+        return result
+
+    def expand_units(self, analysis, unit_ids):
+        """expand_unit for several units, in parallel (UNIT_EXPAND_WORKERS); results in `unit_ids` order."""
+        if len(unit_ids) <= 1:
+            return [self.expand_unit(analysis, u) for u in unit_ids]
+        with ThreadPoolExecutor(max_workers=min(UNIT_EXPAND_WORKERS, len(unit_ids))) as pool:
+            return list(pool.map(lambda u: self.expand_unit(analysis, u), unit_ids))
+
+    def get_analysis(self, analysis_id):
+        """A previously returned analysis by its `analysis_id`: from the cache, else the store."""
+        if not isinstance(analysis_id, str) or not ANALYSIS_ID.fullmatch(analysis_id):
+            return None
+        analysis = self.analysis_cache.get(analysis_id) if self.analysis_cache else None
+        if analysis is None and self.store:
+            try:
+                analysis = self.store.get_analysis(analysis_id)
+            except Exception as e:
+                print(f"⚠️ Analysis store unavailable: {str(e)}")
+        return analysis
+
+    def reschedule(self, ordered_topics, topic_details, weeks, hours, level, completed=(), start_week=1):
+        """
+        New schedule only, for topics already analyzed: drops `completed` topics and
+        packs the rest into `weeks` weeks numbered from `start_week`. No extraction,
+        Gemini or dependency work, so it's cheap enough to run on every slider change.
+        """
+        done = set(completed)
+        remaining = [t for t in ordered_topics if t not in done]
+        with metrics.span("schedule"):
+            plan = build_schedule(remaining, topic_details, weeks, hours, level, first_week=start_week)
+        return {
+            "schedule": plan["weeks"],
+            "overflow": plan["overflow"],
+            "completed": [t for t in ordered_topics if t in done],
+            "remaining": len(remaining),
+            "mentor_summary": mentor_summary(plan["weeks"], plan["overflow"], hours),
+        }
+
+    def run(self, filename, data, params, progress=None):
+        """analyze + plan in one go; `params` is (weeks, hours, level[, compact]). Used by jobs and batches."""
+        analysis = self.analyze(filename, data, progress)
+        if progress:
+            progress("scheduling")
+        return self.plan(analysis, *params)
+
+    def _cached_answer(self, topic, message):
+        if not self.chat_cache:
+            return None
+        cached = self.chat_cache.get(topic, message)
+        metrics.increment("studyflow_cache_requests_total", cache="chat", result="hit" if cached else "miss")
+        return cached
+
+    def chat(self, topic, message):
+        cached = self._cached_answer(topic, message)
+        if cached:
+            return cached
+        model = get_gemini()
+        reason = "no_model"
+        if model:
+            try:
+                answer = model.generate_content(mentor_prompt(topic, message)).text.strip()
+                if self.chat_cache and answer:
+                    self.chat_cache.set(topic, message, answer)
+                return answer
+            except gemini.LLMBusy:
+                reason = "busy"
+            except Exception as e:
+                print(f"Chat error: {str(e)}")
+                reason = "llm_error"
+        metrics.increment("studyflow_fallbacks_total", kind="chat", reason=reason)
+        return fallback_chat_response(topic, message)
+
+    def chat_stream(self, topic, message):
+        """
+        Yields (text, is_fallback) pieces of the mentor reply as Gemini produces them.
+        Falls back to one local reply if Gemini is unavailable or fails before the first chunk.
+        Closing the generator stops reading the upstream stream.
+        """
+        cached = self._cached_answer(topic, message)
+        if cached:
+            yield cached, False
+            return
+        model = get_gemini()
+        reason = "no_model"
+        if model:
+            sent = []
+            try:
+                chunks = iter(model.generate_content(mentor_prompt(topic, message), stream=True))
+                try:
+                    for chunk in chunks:
+                        if chunk.text:
+                            sent.append(chunk.text)
+                            yield chunk.text, False
+                finally:
+                    # Stop the upstream generation when the client disconnects
+                    close = getattr(chunks, 'close', None)
+                    if close:
+                        close()
+                if sent:
+                    if self.chat_cache:
+                        self.chat_cache.set(topic, message, "".join(sent).strip())
+                    return
+                reason = "empty"
+            except gemini.LLMBusy:
+                reason = "busy"
+            except Exception as e:
+                print(f"Chat stream error: {str(e)}")
+                if sent:
+                    return
+                reason = "llm_error"
+        metrics.increment("studyflow_fallbacks_total", kind="chat", reason=reason)
+        yield fallback_chat_response(topic, message), True
+
+
+def build_pipeline(upload_folder):
+    """Pipeline with the env-configured analysis cache and store (under upload_folder) and chat cache."""
+    return StudyPlanPipeline(analysis_cache=build_analysis_cache(upload_folder),
+                             chat_cache=build_chat_cache(),
+                             store=build_store(upload_folder))
@@ -0,0 +1,84 @@
+import io
+import os
+
+# Below this many pages a process pool costs more to start than it saves
+PARALLEL_MIN_PAGES = 32
+
+
+def _open_reader(source):
+    import pypdf
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    return pypdf.PdfReader(source)
+
+
+def _extract_range(source, start, stop):
+    """Worker entry point: text of pages [start, stop) as a list."""
+    reader = _open_reader(source)
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def iter_pdf_pages(source, max_pages=None, workers=1):
+    """
+    Yields the text of each page in order.
+    `source` is a path, the raw PDF bytes or a seekable binary stream. With workers > 1 the page range is
+    split into chunks extracted by a process pool; chunks are still yielded in order
+    and unstarted ones are cancelled when the consumer stops early.
+    """
+    reader = _open_reader(source)
+    n_pages = len(reader.pages)
+    if max_pages is not None:
+        n_pages = min(n_pages, max_pages)
+
+    if workers <= 1 or n_pages < PARALLEL_MIN_PAGES:
+        for i in range(n_pages):
+            yield reader.pages[i].extract_text() or ""
+        return
+
+    del reader  # each worker parses its own copy
+    if hasattr(source, 'read'):
+        source.seek(0)
+        source = source.read()  # streams can't be sent to worker processes
+    chunk = max(8, -(-n_pages // (workers * 4)))
+    try:
+        # multiprocessing is only worth importing once a big PDF takes this branch
+        from concurrent.futures import ProcessPoolExecutor
+        pool = ProcessPoolExecutor(max_workers=workers)
+    except (OSError, NotImplementedError) as e:
+        # Serverless sandboxes often lack the semaphores multiprocessing needs
+        print(f"⚠️ Process pool unavailable, extracting serially: {str(e)}")
+        yield from iter_pdf_pages(source, max_pages=n_pages, workers=1)
+        return
+    futures = [pool.submit(_extract_range, source, s, min(s + chunk, n_pages))
+               for s in range(0, n_pages, chunk)]
+    try:
+        for future in futures:
+            yield from future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+        pool.shutdown(wait=False)
+
+
+def extract_text_from_pdf(source, max_pages=None, max_chars=None, workers=None):
+    """
+    Streams pages and joins them once. Stops reading as soon as `max_chars`
+    characters are collected (the result is cut to that length), so callers that
+    only need the head of a long course pack never parse the rest of it.
+    """
+    if workers is None:
+        workers = int(os.environ.get('PDF_WORKERS', 1))
+    parts = []
+    total = 0
+    pages = iter_pdf_pages(source, max_pages=max_pages, workers=workers)
+    try:
+        for page_text in pages:
+            parts.append(page_text)
+            parts.append("\n")
+            total += len(page_text) + 1
+            if max_chars is not None and total >= max_chars:
+                break
+    finally:
+        pages.close()
+    text = "".join(parts)
+    return text[:max_chars] if max_chars is not None else text
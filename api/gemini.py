@@ -0,0 +1,158 @@
+import os
+import threading
+import time
+
+import metrics
+from limits import LLMBusy, build_llm_governor  # noqa: F401 (LLMBusy is re-exported for callers)
+
+MODEL_NAME = 'gemini-1.5-flash'
+
+
+class _SlotStream:
+    """A streamed response that gives its governor slot back once exhausted or closed."""
+
+    def __init__(self, chunks, release):
+        self._chunks = iter(chunks)
+        self._release = release
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._chunks)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        release, self._release = self._release, None
+        if release:
+            close = getattr(self._chunks, 'close', None)
+            if close:
+                close()
+            release()
+
+    def __del__(self):
+        self.close()
+
+
+class TimedModel:
+    """
+    Wraps a GenerativeModel so every generate_content call is timed and holds a
+    governor slot (raising LLMBusy when none frees up in time).
+    """
+
+    def __init__(self, model, registry):
+        self._model = model
+        self._registry = registry
+
+    def generate_content(self, *args, **kwargs):
+        governor = self._registry.governor
+        if governor:
+            governor.acquire()
+        start = time.perf_counter()
+        release = (lambda: governor.release(time.perf_counter() - start)) if governor else (lambda: None)
+        try:
+            with metrics.span("llm"):
+                response = self._model.generate_content(*args, **kwargs)
+        except Exception:
+            self._registry._record_call(time.perf_counter() - start, failed=True)
+            release()
+            raise
+        self._registry._record_call(time.perf_counter() - start)
+        if kwargs.get('stream'):
+            # Chunks keep arriving after the call returns; hold the slot until they stop
+            return _SlotStream(response, release)
+        release()
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self._model, name)
+
+
+class GeminiRegistry:
+    """
+    One Gemini client per worker process, created on first use.
+    Re-initializes when GEMINI_API_KEY changes; returns None while no key is set
+    or the SDK is unavailable. Init and call timings are kept separately so the
+    cold-start cost can be told apart from inference.
+    """
+
+    def __init__(self, model_name=MODEL_NAME, governor=None):
+        self.model_name = model_name
+        self.governor = governor
+        self._lock = threading.Lock()
+        self._model = None
+        self._key = None
+        self._failed_key = None
+        self._override = None
+        self._stats = {"inits": 0, "init_seconds": 0.0, "last_init_seconds": None,
+                       "init_failures": 0, "calls": 0, "call_seconds": 0.0, "call_failures": 0}
+
+    def get(self):
+        if self._override is not None:
+            return self._override
+        api_key = os.environ.get('GEMINI_API_KEY')
+        if not api_key:
+            return None
+        model = self._model
+        if model is not None and self._key == api_key:
+            return model
+        with self._lock:
+            if self._model is not None and self._key == api_key:
+                return self._model
+            if self._failed_key == api_key:
+                return None
+            start = time.perf_counter()
+            try:
+                import google.generativeai as genai
+                genai.configure(api_key=api_key)
+                self._model = TimedModel(genai.GenerativeModel(self.model_name), self)
+                self._key = api_key
+                self._failed_key = None
+            except Exception as e:
+                print(f"❌ Gemini load failed: {str(e)}")
+                self._model = None
+                self._failed_key = api_key
+                self._stats["init_failures"] += 1
+                return None
+            elapsed = time.perf_counter() - start
+            self._stats["inits"] += 1
+            self._stats["init_seconds"] += elapsed
+            self._stats["last_init_seconds"] = elapsed
+            metrics.observe("studyflow_stage_seconds", elapsed, stage="llm_init")
+            print(f"✅ Gemini client ready in {elapsed * 1000:.0f} ms")
+            return self._model
+
+    def override(self, model):
+        """Serve `model` (e.g. a local stand-in) regardless of GEMINI_API_KEY until reset()."""
+        with self._lock:
+            self._override = TimedModel(model, self)
+
+    def reset(self):
+        with self._lock:
+            self._model = None
+            self._key = None
+            self._failed_key = None
+            self._override = None
+
+    def _record_call(self, seconds, failed=False):
+        with self._lock:
+            self._stats["calls"] += 1
+            self._stats["call_seconds"] += seconds
+            if failed:
+                self._stats["call_failures"] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+
+# One governor per process: caps concurrent generate_content calls across all requests
+registry = GeminiRegistry(governor=build_llm_governor())
+
+
+def get_gemini():
+    """Shared, lazily initialized Gemini model (None when unavailable)."""
+    return registry.get()
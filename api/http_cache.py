@@ -0,0 +1,29 @@
+import hashlib
+
+# Compressed bodies get their own strong ETag ("<tag>-gzip"), as the bytes differ;
+# If-None-Match is matched against every variant of the same content
+ENCODINGS = ("gzip", "br")
+
+
+def content_etag(body):
+    """Strong ETag value (unquoted) for a response body: the first 32 hex digits of its SHA-256."""
+    return hashlib.sha256(body).hexdigest()[:32]
+
+
+def encoded_etag(etag, encoding):
+    return f"{etag}-{encoding}"
+
+
+def matching_etag(if_none_match, etag):
+    """
+    The variant of `etag` named in werkzeug's request.if_none_match (weak comparison,
+    as RFC 9110 specifies for If-None-Match), or None when the client's copy is stale.
+    """
+    if not if_none_match:
+        return None
+    if if_none_match.star_tag:
+        return etag
+    for variant in (etag, *(encoded_etag(etag, e) for e in ENCODINGS)):
+        if if_none_match.contains_weak(variant):
+            return variant
+    return None
@@ -1,319 +1,229 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify
 from flask_cors import CORS
 import os
 import sys
-import re
 import json
-import pypdf
+import time
+import threading
+from functools import wraps
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from werkzeug.exceptions import HTTPException
 from werkzeug.utils import secure_filename
-from dotenv import load_dotenv
 
-load_dotenv()
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import metrics
+import compression
+import http_cache
+from limits import build_rate_limiter
+from ingest import SpoolingRequest, UPLOAD_MAX_BYTES
+from store import page_bounds
+from catalog import get_catalog
+# Pipeline stages are re-exported for scripts and benchmarks that drive them one by one
+from engine import (build_pipeline, topics_from_payload, unit_skeleton, get_gemini, extract_text_from_pdf, clean_text,
+                    identify_topics, analyze_dependencies, get_study_order, classify_topics_fully, generate_schedule)
+
+# Vercel injects env vars itself; only local runs need python-dotenv (and its import time)
+if not os.environ.get('VERCEL'):
+    from dotenv import load_dotenv
+    load_dotenv()
 
 app = Flask(__name__)
+# Uploads are parsed straight from memory (spilling to self-deleting temp files only
+# above UPLOAD_SPOOL_BYTES); bodies over UPLOAD_MAX_BYTES are refused with 413
+app.request_class = SpoolingRequest
+app.config['MAX_CONTENT_LENGTH'] = UPLOAD_MAX_BYTES
 CORS(app)
 
+# Per-request Server-Timing header: always with SERVER_TIMING=1, otherwise opt in with ?timing=1
+SERVER_TIMING = os.environ.get('SERVER_TIMING') == '1'
+
 @app.before_request
 def log_request():
     print(f"📡 Request: [{request.method}] {request.path}")
+    g.request_start = time.perf_counter()
+    metrics.start_request()
 
-# ==========================================
-# 🤖 GEMINI CONFIGURATION
-# ==========================================
-def get_gemini():
-    try:
-        import google.generativeai as genai
-        api_key = os.environ.get('GEMINI_API_KEY')
-        if not api_key:
-            return None
-        genai.configure(api_key=api_key)
-        return genai.GenerativeModel('gemini-1.5-flash')
-    except Exception as e:
-        print(f"❌ Gemini load failed: {str(e)}")
-        return None
+@app.after_request
+def record_request(response):
+    start = g.get('request_start')
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        elapsed = time.perf_counter() - start
+        metrics.observe("studyflow_request_seconds", elapsed, route=route, method=request.method)
+        if SERVER_TIMING or request.args.get('timing') == '1':
+            timing = metrics.server_timing()
+            response.headers['Server-Timing'] = f"{timing + ', ' if timing else ''}total;dur={elapsed * 1000:.1f}"
+    return response
 
-# ==========================================
-# 📄 UTILS (Self-contained)
-# ==========================================
-
-def extract_text_from_pdf(pdf_path):
-    text = ""
-    try:
-        with open(pdf_path, 'rb') as file:
-            reader = pypdf.PdfReader(file)
-            for page in reader.pages:
-                text += (page.extract_text() or "") + "\n"
-    except Exception as e:
-        print(f"Error extracting PDF: {str(e)}")
-    return text
-
-def clean_text(text):
-    # Keep alphanumeric and basic punctuation
-    text = re.sub(r'[^\w\s\.,;:\-\(\)]', ' ', text)
-    # Collapse multiple spaces/tabs to single space (but NOT newlines)
-    text = re.sub(r'[ \t]+', ' ', text)
-    # Collapse multiple newlines to single newline
-    text = re.sub(r'\n+', '\n', text)
-    return text.strip()
-
-def identify_topics(text):
-    """Uses Gemini API with fallback to regex"""
-    model = get_gemini()
-    if model:
-        try:
-            # 1. Detect subject to remove it from topic titles
-            subject_name = ""
-            try:
-                sub_res = model.generate_content(f"Identify the main subject name from this text in 2 words max. Text: {text[:400]}")
-                subject_name = sub_res.text.strip().lower()
-            except: pass
-
-            prompt = f"""
-            Extract a COMPREHENSIVE and DETAILED list of learning topics from the text provided.
-            
-            GOAL: Break down every Unit/Chapter/Section into at least 4-6 specific technical sub-topics. 
-            Aim for at least 25-30 distinct conceptual topics in total.
-            
-            Rules:
-            1. DO NOT return Unit/Chapter headers (e.g., skip "Unit 1", "Module 2").
-            2. Extract specific concepts (e.g., "A* Search Algorithm", "Backpropagation", "Gradient Descent").
-            3. STRIP the subject name "{subject_name}" and words like "Notes", "Syllabus", "Question Bank", "Important", "Part" from every topic.
-            4. Remove all Roman numerals (I, II, III, IV, V...), numbering (1.1, 2.3...), and labels like "UNIT" or "TOPIC".
-            5. Each topic should be 2-5 words.
-            6. Return ONLY a JSON array of strings.
-            
-            Text:
-            {text[:8000]}
-            """
-            response = model.generate_content(prompt)
-            raw = response.text.replace('```json', '').replace('```', '').strip()
-            
-            # Extract JSON array
-            start = raw.find('[')
-            end = raw.rfind(']') + 1
-            if start != -1 and end != 0:
-                topics = json.loads(raw[start:end])
-                if isinstance(topics, list) and len(topics) > 0:
-                    cleaned = []
-                    # More robust noise removal
-                    for t in topics:
-                        t = str(t).strip()
-                        # Strip Roman Numerals and headers at start (case insensitive)
-                        # Handled more specifically to avoid stripping 'I' out of concepts
-                        t = re.sub(r'^(?i)(UNIT|MODULE|CHAPTER|TOPIC|SECTION|PART|LESSON|ROMAN|WEEK|SESSION)\s*[\d\.\-\:]*', '', t).strip()
-                        t = re.sub(r'^(?i)(IX|IV|V?I{0,3})\s*[\d\.\-\:]*', '', t).strip() # Roman numerals
-                        
-                        # Strip subject name and common noise words anywhere in the string
-                        if subject_name and len(subject_name) > 3:
-                            t = re.sub(re.escape(subject_name), '', t, flags=re.IGNORECASE).strip()
-                        
-                        # Strip trailing junk
-                        t = re.sub(r'(?i)\s*(Syllabus|Notes|Course|University|Credit|Instructor|Hours|Question Bank|Extra Questions|Important Questions|Question Paper|Objective|Summary|Module|Unit|Chapter|Topic)\s*$', '', t).strip()
-                        
-                        # General cleanup
-                        t = re.sub(r'^[^a-zA-Z0-9]+', '', t).strip() # Leading junk
-                        t = re.sub(r'\s+', ' ', t).strip()
-                        
-                        # Final filter: remove AI talk and extremely short/generic junk
-                        lower_t = t.lower()
-                        if (t and len(t) > 3 and 
-                            not any(noise in lower_t for noise in ["you said", "here are", "identified", "topics", "content of", "syllabus for"])):
-                            cleaned.append(t.capitalize())
-                            
-                    return list(dict.fromkeys(cleaned))[:35]
-        except Exception as e:
-            print(f"Gemini topic extraction failed: {str(e)}")
-            
-    # Enhanced Fallback
-    lines = text.split('\n')
-    topics = []
-    seen = set()
-    for line in lines:
-        line = line.strip()
-        if not line or len(line) < 5: continue
-        
-        # Capture lines that look like topics
-        if (re.match(r'^(UNIT|MODULE|CHAPTER|TOPIC|SECTION)\s', line, re.IGNORECASE) or 
-            re.match(r'^[\d\.\-\*\•]+\s+[A-Z]', line) or 
-            (line[0].isupper() and len(line) < 80)):
-            
-            t = re.sub(r'^[\d\.\-\*\•\s]+', '', line).strip()
-            t = re.sub(r'^(UNIT|MODULE|CHAPTER|TOPIC|SECTION)\s*[\d\.\-\:]*\s*', '', t, flags=re.IGNORECASE)
-            t = re.sub(r'[A-Z]{2,}\d{3,}[A-Z]*', '', t).strip()
-            
-            cleaned = t.capitalize()
-            if cleaned and cleaned not in seen and len(cleaned) > 2:
-                topics.append(cleaned)
-                seen.add(cleaned)
-    
-    return topics[:20]
+# gzip (br when the brotli package is installed) for JSON/text bodies of at least
+# COMPRESS_MIN_BYTES; streamed responses (SSE, NDJSON) are left alone
+RESPONSE_COMPRESSION = os.environ.get('RESPONSE_COMPRESSION', '1') != '0'
+COMPRESS_MIN_BYTES = int(os.environ.get('COMPRESS_MIN_BYTES', 1024))
 
-# ==========================================
-# ⚙️ PROCESSOR (Self-contained)
-# ==========================================
+@app.after_request
+def compress_response(response):
+    if (not RESPONSE_COMPRESSION or response.is_streamed or response.direct_passthrough
+            or response.mimetype not in compression.COMPRESSIBLE_TYPES
+            or 'Content-Encoding' in response.headers or not 200 <= response.status_code < 300):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = compression.choose_encoding(request.accept_encodings)
+    body = response.get_data()
+    if encoding is None or len(body) < COMPRESS_MIN_BYTES:
+        return response
+    response.set_data(compression.compress(body, encoding))
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(http_cache.encoded_etag(etag, encoding))
+    return response
 
-def analyze_dependencies(topics):
+def cacheable(cache_control, etag=None):
     """
-    Builds a dependency graph. 
-    1. Implicitly assumes sequential topics in the text are related.
-    2. Uses Jaccard Similarity to find keywords overlaps.
+    Strong ETag and Cache-Control on 200 responses; a matching If-None-Match gets an
+    empty 304 instead. The ETag is etag() when given, checked before the view runs,
+    else a hash of the body. `cache_control` may be a string or a function; a
+    Cache-Control the view sets itself takes precedence.
     """
-    graph = {topic: [] for topic in topics}
-    tokens = [set(re.findall(r'\w+', t.lower())) for t in topics]
-    
-    # Keyword-based dependencies
-    for i in range(len(topics)):
-        for j in range(i + 1, len(topics)):
-            if not tokens[i] or not tokens[j]: continue
-            # If topics share significant words, assume dependency
-            intersection = tokens[i].intersection(tokens[j])
-            if len(intersection) >= 1:
-                similarity = len(intersection) / len(tokens[i].union(tokens[j]))
-                if similarity > 0.15:
-                    graph[topics[i]].append(topics[j])
-                    
-    # Sequential context dependency (Topic N is often a prerequisite for N+1)
-    for i in range(len(topics) - 1):
-        if topics[i+1] not in graph[topics[i]]:
-            graph[topics[i]].append(topics[i+1])
-            
-    return graph
-
-def get_study_order(graph):
-    in_degree = {node: 0 for node in graph}
-    for node in graph:
-        for neighbor in graph[node]:
-            if neighbor in in_degree: in_degree[neighbor] += 1
-    
-    queue = [node for node in graph if in_degree[node] == 0]
-    result = []
-    while queue:
-        node = queue.pop(0)
-        result.append(node)
-        for neighbor in graph.get(node, []):
-            if neighbor in in_degree:
-                in_degree[neighbor] -= 1
-                if in_degree[neighbor] == 0: queue.append(neighbor)
-    
-    if len(result) < len(graph):
-        for node in graph:
-            if node not in result: result.append(node)
-    return result
-
-# Teacher's Insights & Resources Mapping
-MENTOR_TIPS = {
-    "introduction": "Don't just memorize definitions. Try to understand the 'Why' behind this field.",
-    "basic": "Strong foundations make complex topics easier. Spend extra time here if you're a beginner.",
-    "neural": "Think of this as biological inspiration. Visualize the layers and connections.",
-    "search": "Search algorithms are the heart of problem solving. Draw the search trees to visualize state space.",
-    "heuristic": "Heuristics are 'rules of thumb'. Think about how they estimate cost to goals.",
-    "logic": "Follow the flow step-by-step. Logical inference is about derivation from facts.",
-    "algorithm": "Practice with small examples first. Complexity matters more than syntax.",
-    "math": "Focus on the logic, not just the formulas. Use online calculators to verify.",
-    "probabilistic": "Probability handles uncertainty. Focus on Bayes' rule and conditional independence.",
-    "inference": "This is about drawing conclusions from data. It's the 'reasoning' part of AI.",
-    "hard": "Break this into 3 smaller chunks. Don't try to finish it in one sitting.",
-    "application": "Think about where you see this in your daily life like Google Maps or Siri."
-}
-
-def get_mentor_advice(topic):
-    t_lower = topic.lower()
-    for key, tip in MENTOR_TIPS.items():
-        if key in t_lower: return tip
-    return "Focus on understanding the core concepts through real-world examples and practice."
-
-def get_resource_links(topic):
-    query = topic.replace(' ', '+')
-    return [
-        {"name": "YouTube Tutorial", "url": f"https://www.youtube.com/results?search_query={query}+tutorial"},
-        {"name": "GeeksforGeeks", "url": f"https://www.google.com/search?q={query}+geeksforgeeks"},
-        {"name": "Lecture Notes", "url": f"https://www.google.com/search?q={query}+lecture+notes+pdf"},
-        {"name": "Interview Prep", "url": f"https://www.google.com/search?q={query}+interview+questions"},
-        {"name": "Wikipedia", "url": f"https://en.wikipedia.org/wiki/{query}"}
-    ]
-
-def classify_topics_fully(ordered_topics):
-    easy_keywords = ['introduction', 'basics', 'overview', 'concept', 'history', 'units', 'defintion', 'scope', 'applications']
-    hard_keywords = ['advanced', 'neural', 'optimization', 'complex', 'inference', 'backpropagation', 'bayesian', 'deep', 'logic', 'calculus', 'integration', 'heuristics', 'probabilistic', 'adversarial', 'learning']
-    
-    topic_details = {}
-    for topic in ordered_topics:
-        score = 2  # Default Medium
-        t_lower = topic.lower()
-        if any(kw in t_lower for kw in easy_keywords): score = 1
-        if any(kw in t_lower for kw in hard_keywords): score = 3
-        
-        topic_details[topic] = {
-            "difficulty": score, 
-            "advice": get_mentor_advice(topic),
-            "resources": get_resource_links(topic)
-        }
-    return topic_details
-
-def generate_schedule(ordered_topics, topic_details, weeks, hours, level):
-    if level == "Beginner":
-        weights = {1: 2.5, 2: 3, 3: 4}
-    elif level == "Advanced":
-        weights = {1: 0.5, 2: 1.5, 3: 3}
-    else:  # Intermediate
-        weights = {1: 1, 2: 2, 3: 3}
-    
-    topic_weights = [(t, weights.get(topic_details[t]["difficulty"], 2)) for t in ordered_topics]
-    total_weight = sum(w for _, w in topic_weights) or 1
-    weight_per_week = total_weight / weeks
-    
-    schedule = []
-    curr_topics, curr_weight, w_num = [], 0, 1
-    for topic, weight in topic_weights:
-        curr_topics.append(topic)
-        curr_weight += weight
-        if curr_weight >= weight_per_week and w_num < weeks:
-            schedule.append({"week": w_num, "topics": curr_topics})
-            curr_topics, curr_weight, w_num = [], 0, w_num + 1
-    
-    if curr_topics:
-        if w_num > weeks:
-            schedule[-1]["topics"].extend(curr_topics)
-        else:
-            schedule.append({"week": w_num, "topics": curr_topics})
-    return schedule
-
-def chat_with_mentor(topic, message):
-    model = get_gemini()
-    if model:
-        try:
-            prompt = f"""
-            You are a friendly and expert academic mentor. 
-            The student is studying "{topic}" and has a doubt.
-            
-            Student Question: "{message}"
-            
-            Provide a helpful, encouraging, and technically accurate response in 2-3 sentences.
-            If the question is unrelated to the topic, gently guide them back to studying.
-            """
-            return model.generate_content(prompt).text.strip()
-        except Exception as e:
-            print(f"Chat error: {str(e)}")
-    return f"Focus on understanding the core concepts of {topic} through practice. Try checking the resources provided!"
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            tag = etag() if etag else None
+            response = None
+            policy = None
+            if tag is None:
+                response = app.make_response(view(*args, **kwargs))
+                if response.status_code != 200 or response.is_streamed:
+                    return response
+                tag = http_cache.content_etag(response.get_data())
+                policy = response.headers.get('Cache-Control')
+            matched = http_cache.matching_etag(request.if_none_match, tag)
+            if matched:
+                metrics.increment("studyflow_not_modified_total", route=request.url_rule.rule)
+                response = Response(status=304)
+                response.set_etag(matched)
+                response.vary.add('Accept-Encoding')
+            else:
+                if response is None:
+                    response = app.make_response(view(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+                    policy = response.headers.get('Cache-Control')
+                response.set_etag(tag)
+            response.headers['Cache-Control'] = policy or (cache_control() if callable(cache_control) else cache_control)
+            return response
+        return wrapper
+    return decorator
+
+# Cache-Control for GET routes. s-maxage lets Vercel's edge answer repeat reads without
+# invoking the function; stale-while-revalidate keeps serving while it refreshes.
+HEALTH_CACHE_CONTROL = os.environ.get('HEALTH_CACHE_CONTROL',
+                                      "public, max-age=30, s-maxage=300, stale-while-revalidate=600")
+ANALYSIS_CACHE_CONTROL = os.environ.get('ANALYSIS_CACHE_CONTROL',
+                                        "public, max-age=300, s-maxage=3600, stale-while-revalidate=86400")
+# Per-student and job data changes underneath the URL: revalidate every time (cheap with a 304)
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+# Per-client token bucket in front of the routes that reach Gemini (RATE_LIMIT_PER_MINUTE,
+# RATE_LIMIT_BURST). Counted per process, so each serverless instance keeps its own buckets.
+rate_limiter = build_rate_limiter()
+
+# Behind Vercel's proxy the client is the first X-Forwarded-For hop; elsewhere that
+# header is client-controlled and only trusted with TRUST_FORWARDED_FOR=1
+TRUST_FORWARDED_FOR = bool(os.environ.get('VERCEL')) or os.environ.get('TRUST_FORWARDED_FOR') == '1'
+
+def client_ip():
+    if TRUST_FORWARDED_FOR and request.headers.get('X-Forwarded-For'):
+        return request.headers['X-Forwarded-For'].split(',')[0].strip()
+    return request.remote_addr or "unknown"
+
+def rate_limited(cost=None):
+    """Answers 429 with Retry-After once a client runs out of tokens; cost() prices the request (default 1)."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if rate_limiter is not None:
+                allowed, wait = rate_limiter.allow(client_ip(), cost() if cost else 1)
+                if not allowed:
+                    retry_after = max(1, int(wait + 0.999))
+                    metrics.increment("studyflow_rate_limited_total", route=request.url_rule.rule)
+                    response = jsonify({"error": "Too many requests, please slow down", "retry_after": retry_after})
+                    response.headers['Retry-After'] = str(retry_after)
+                    return response, 429
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
 
 # ==========================================
 # 🌐 ROUTES
 # ==========================================
 
 @app.route('/api/health', methods=['GET'])
+@cacheable(HEALTH_CACHE_CONTROL)
 def health():
     return jsonify({"status": "healthy", "message": "API is running!", "timestamp": "2026-02-17"})
 
 @app.route('/api/chat', methods=['POST'])
+@rate_limited()
 def chat():
     data = request.json or {}
-    return jsonify({"response": chat_with_mentor(data.get('topic', 'General'), data.get('message', ''))})
+    return jsonify({"response": pipeline.chat(data.get('topic', 'General'), data.get('message', ''))})
+
+def sse_event(data, event=None):
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+@app.route('/api/chat/stream', methods=['POST'])
+@rate_limited()
+def chat_stream():
+    """
+    Server-sent events version of /api/chat: one `data: {"text": ...}` event per chunk
+    ("fallback": true on the single local reply), then `event: done`.
+    """
+    data = request.json or {}
+    replies = pipeline.chat_stream(data.get('topic', 'General'), data.get('message', ''))
+
+    def events():
+        try:
+            for text, is_fallback in replies:
+                yield sse_event({"text": text, "fallback": is_fallback})
+            yield sse_event({}, event="done")
+        finally:
+            replies.close()
+
+    return Response(events(), mimetype='text/event-stream',
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# Catalog responses are static per deploy: an hour in browsers, a day at the edge, or for
+# good when requested by version (?v=, the "catalog" field of compact responses)
+CATALOG_MAX_AGE = int(os.environ.get('CATALOG_MAX_AGE', 3600))
+CATALOG_EDGE_MAX_AGE = int(os.environ.get('CATALOG_EDGE_MAX_AGE', 24 * 3600))
+
+def catalog_cache_control():
+    if request.args.get('v') == get_catalog().version:
+        return "public, max-age=31536000, immutable"
+    return f"public, max-age={CATALOG_MAX_AGE}, s-maxage={CATALOG_EDGE_MAX_AGE}"
+
+@app.route('/api/catalog', methods=['GET'])
+@cacheable(catalog_cache_control, etag=lambda: get_catalog().version)
+def resource_catalog():
+    """Mentor tips, link templates and curated links that compact responses reference by id"""
+    return jsonify(get_catalog().payload())
+
+@app.route('/api/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Stage latency percentiles, fallback and cache counters in Prometheus text format"""
+    return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
 
 @app.errorhandler(404)
 def not_found(e):
     return jsonify({"error": "Path not found", "path": request.path}), 404
 
-# Handle File Uploads (Vercel requires /tmp for writability)
+@app.errorhandler(413)
+def too_large(e):
+    return jsonify({"error": f"Upload too large (max {round(UPLOAD_MAX_BYTES / (1024 * 1024), 1):g} MB)"}), 413
+
+# Analysis cache and job store live here (Vercel requires /tmp for writability)
 if os.environ.get('VERCEL'):
     UPLOAD_FOLDER = '/tmp'
 else:
@@ -328,7 +238,25 @@ if not os.path.exists(UPLOAD_FOLDER):
 
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 
+# Analyses keyed by upload hash, so repeat uploads of a syllabus skip extraction and Gemini;
+# mentor answers are reused across students asking the same things
+pipeline = build_pipeline(UPLOAD_FOLDER)
+
+if pipeline.chat_cache:
+    metrics.register_gauge("studyflow_chat_cache_hit_ratio", lambda: [({}, pipeline.chat_cache.stats()["hit_rate"])],
+                           "Share of mentor chat lookups answered from the cache.")
+
+def schedule_params(form):
+    return int(form.get('weeks', 4)), int(form.get('hours', 10)), form.get('level', 'Beginner')
+
+def plan_params(form):
+    """schedule_params plus the response format: ?format=compact (or a form field) selects
+    the indexed payload, with topics written once and links as index pairs."""
+    compact = (request.args.get('format') or form.get('format')) == 'compact'
+    return (*schedule_params(form), compact)
+
 @app.route('/api/analyze', methods=['POST'])
+@rate_limited()
 def analyze_syllabus():
     try:
         print("📥 Received analyze request")
@@ -341,44 +269,20 @@ def analyze_syllabus():
             return jsonify({"error": "No filename"}), 400
         
         filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        print(f"💾 Saving file to {filepath}")
-        file.save(filepath)
-        
-        print("📄 Extracting text...")
-        raw_text = extract_text_from_pdf(filepath) if filename.endswith('.pdf') else open(filepath, 'r', errors='ignore').read()
-        cleaned_text = clean_text(raw_text)
-        
-        print("🤖 Identifying topics via Gemini...")
-        topics = identify_topics(cleaned_text)
-        if not topics:
-            print("⚠️ No topics extracted, using fallback...")
-            topics = ["Introduction", "Core Concepts", "Advanced Modules", "Conclusion"]
-            
-        print(f"📊 Analyzing dependencies for {len(topics)} topics...")
-        G = analyze_dependencies(topics)
-        ordered_topics = get_study_order(G)
-        
-        print("🏷️ Classifying topics...")
-        topic_details = classify_topics_fully(ordered_topics)
-        
-        print("📅 Generating schedule...")
-        schedule = generate_schedule(ordered_topics, topic_details, 
-                                     int(request.form.get('weeks', 4)), 
-                                     int(request.form.get('hours', 10)), 
-                                     request.form.get('level', 'Beginner'))
-        
-        nodes = [{"id": n, "group": topic_details[n]["difficulty"]} for n in G]
-        links = [{"source": u, "target": v} for u in G for v in G[u]]
+        if request.args.get('async') == '1' or request.form.get('async') == '1':
+            job_id = get_job_queue().submit(filename, file.read(), plan_params(request.form))
+            print(f"🧾 Queued analysis job {job_id}")
+            return jsonify({"job_id": job_id, "status": "queued", "status_url": f"/api/jobs/{job_id}"}), 202
+
+        # Read in place from the spooled upload; nothing is written to the upload folder
+        params = plan_params(request.form)
+        result = pipeline.run(filename, file.stream, params)
+        record_plan(result, request.form, params)
         
         print("✅ Analysis complete!")
-        return jsonify({
-            "topics": ordered_topics,
-            "topic_details": topic_details,
-            "schedule": schedule,
-            "graph": {"nodes": nodes, "links": links},
-            "mentor_summary": f"I've analyzed your content and created a {len(schedule)}-week strategic roadmap!"
-        })
+        return jsonify(result)
+    except HTTPException:
+        raise  # e.g. 413 from the upload size cap
     except Exception as e:
         import traceback
         error_msg = str(e)
@@ -386,5 +290,245 @@ def analyze_syllabus():
         print(traceback.format_exc())
         return jsonify({"error": error_msg, "traceback": traceback.format_exc()}), 500
 
+@app.route('/api/schedule', methods=['POST'])
+def reschedule():
+    """
+    Re-plans an analyzed syllabus without re-uploading it. JSON body: "analysis_id"
+    (from /api/analyze) or the returned "topics" + "topic_details", plus weeks/hours/level,
+    optional "completed" topics and "start_week". Returns only the new schedule.
+    With "student" + "course" the schedule is saved, and "completed" defaults to the
+    student's stored progress.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        weeks, hours, level = schedule_params(data)
+        start_week = int(data.get('start_week', 1))
+    except (TypeError, ValueError):
+        return jsonify({"error": "weeks, hours and start_week must be integers"}), 400
+    completed = data.get('completed')
+    if completed is None and pipeline.store and data.get('student') and data.get('course'):
+        completed = sorted(pipeline.store.completed_topics(str(data['student']), str(data['course'])))
+    completed = completed or []
+    if not isinstance(completed, list):
+        return jsonify({"error": "completed must be a list of topics"}), 400
+
+    analysis = pipeline.get_analysis(data.get('analysis_id'))
+    if analysis:
+        topics, topic_details = analysis["ordered_topics"], analysis["topic_details"]
+    elif data.get('analysis_id') and 'topics' not in data:
+        # Evicted or never cached (e.g. Gemini fell back): the client still has the topics
+        return jsonify({"error": "Unknown or expired analysis_id; send topics and topic_details instead",
+                        "analysis_id": data.get('analysis_id')}), 404
+    else:
+        try:
+            topics, topic_details = topics_from_payload(data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+    result = pipeline.reschedule(topics, topic_details, weeks, hours, level, completed, start_week)
+    result["analysis_id"] = analysis["id"] if analysis else None
+    record_plan(result, data, (weeks, hours, level))
+    return jsonify(result)
+
+# ==========================================
+# 🗄️ PERSISTENCE (see store.py)
+# ==========================================
+
+def record_plan(result, fields, params):
+    """
+    Saves a returned schedule for fields["student"] and files its analysis under
+    fields["course"]; sets "schedule_id" on the result. A store failure never fails the request.
+    """
+    student, course = fields.get('student'), fields.get('course')
+    if not pipeline.store or not (student or course):
+        return
+    try:
+        if course and result.get("analysis_id"):
+            pipeline.store.set_analysis_course(result["analysis_id"], str(course))
+        if student:
+            schedule = result["schedule"]
+            if result.get("format") == "compact":
+                schedule = [{**week, "topics": [result["topics"][i] for i in week["topics"]]} for week in schedule]
+            result["schedule_id"] = pipeline.store.save_schedule(
+                str(student), schedule, {"weeks": params[0], "hours": params[1], "level": params[2]},
+                result.get("analysis_id"), course and str(course))
+    except Exception as e:
+        print(f"⚠️ Could not persist schedule: {str(e)}")
+
+def paginated(fetch):
+    """JSON page from fetch(limit, offset) -> (items, has_more), with ?limit= and ?offset= from the query."""
+    if not pipeline.store:
+        return jsonify({"error": "Persistence is disabled (STORE=0)"}), 503
+    try:
+        limit, offset = page_bounds(request.args.get('limit'), request.args.get('offset'))
+    except ValueError:
+        return jsonify({"error": "limit and offset must be integers"}), 400
+    items, has_more = fetch(limit, offset)
+    return jsonify({"items": items, "limit": limit, "offset": offset,
+                    "next_offset": offset + limit if has_more else None})
+
+@app.route('/api/analyses', methods=['GET'])
+@cacheable(PRIVATE_CACHE_CONTROL)
+def list_analyses():
+    """Stored analyses, newest first, filtered by ?content_hash= and/or ?course=; summaries only."""
+    return paginated(lambda limit, offset: pipeline.store.list_analyses(
+        request.args.get('content_hash'), request.args.get('course'), limit, offset))
+
+@app.route('/api/analyses/<analysis_id>', methods=['GET'])
+@cacheable(ANALYSIS_CACHE_CONTROL)
+def get_stored_analysis(analysis_id):
+    """Topics, topic_details, adjacency, order and cycles of an analysis (cache or store)."""
+    analysis = pipeline.get_analysis(analysis_id)
+    if analysis is None:
+        return jsonify({"error": "Analysis not found", "analysis_id": analysis_id}), 404
+    return jsonify({k: v for k, v in analysis.items() if k != "text"})
+
+def unit_response(payload, units):
+    """
+    JSON response for expanded units. Outline fallbacks are replaced by Gemini's answer
+    once it comes, so a response containing one must not be kept by shared caches.
+    """
+    response = jsonify(payload)
+    if any(unit["source"] != "gemini" for unit in units):
+        response.headers['Cache-Control'] = PRIVATE_CACHE_CONTROL
+    return response
+
+def unit_ids(analysis):
+    """Unit ids from ?expand=0,2,... for an analysis; raises ValueError on unknown ids."""
+    raw = request.args.get('expand', '')
+    ids = [int(u) for u in raw.split(',') if u.strip()] if raw else []
+    if any(not 0 <= u < len(analysis.get("units") or ()) for u in ids):
+        raise ValueError("unknown unit id")
+    return list(dict.fromkeys(ids))
+
+@app.route('/api/analyses/<analysis_id>/units', methods=['GET'])
+@rate_limited(cost=lambda: max(1, len(request.args.get('expand', '').split(','))))
+@cacheable(ANALYSIS_CACHE_CONTROL)
+def get_units(analysis_id):
+    """
+    The unit skeleton of an analysis ({"id", "title", "topics"} per unit), plus the
+    subtopics of the units listed in ?expand=0,2,... (expanded in parallel) under "expanded".
+    """
+    analysis = pipeline.get_analysis(analysis_id)
+    if analysis is None:
+        return jsonify({"error": "Analysis not found", "analysis_id": analysis_id}), 404
+    try:
+        ids = unit_ids(analysis)
+    except ValueError:
+        return jsonify({"error": "expand must list unit ids of this analysis"}), 400
+    expanded = pipeline.expand_units(analysis, ids)
+    return unit_response({"analysis_id": analysis_id,
+                          "units": unit_skeleton(analysis, lambda i: analysis["topics"][i]),
+                          "expanded": expanded}, expanded)
+
+@app.route('/api/analyses/<analysis_id>/units/<int:unit_id>', methods=['GET'])
+@rate_limited()
+@cacheable(ANALYSIS_CACHE_CONTROL)
+def get_unit(analysis_id, unit_id):
+    """One unit with its topics and their subtopics (Gemini per unit, cached; else the outline)."""
+    analysis = pipeline.get_analysis(analysis_id)
+    if analysis is None or not 0 <= unit_id < len(analysis.get("units") or ()):
+        return jsonify({"error": "Unit not found", "analysis_id": analysis_id, "unit": unit_id}), 404
+    unit = pipeline.expand_unit(analysis, unit_id)
+    return unit_response(unit, [unit])
+
+@app.route('/api/students/<student>/schedules', methods=['GET'])
+@cacheable(PRIVATE_CACHE_CONTROL)
+def list_student_schedules(student):
+    return paginated(lambda limit, offset: pipeline.store.list_schedules(
+        student, request.args.get('course'), limit, offset))
+
+@app.route('/api/students/<student>/progress', methods=['GET'])
+@cacheable(PRIVATE_CACHE_CONTROL)
+def get_student_progress(student):
+    """Per-topic completion, optionally for one ?course=."""
+    return paginated(lambda limit, offset: pipeline.store.get_progress(
+        student, request.args.get('course'), limit, offset))
+
+@app.route('/api/students/<student>/progress', methods=['POST'])
+def set_student_progress(student):
+    """JSON body: "course", "topics" (list), optional "completed" (default true) and "analysis_id"."""
+    if not pipeline.store:
+        return jsonify({"error": "Persistence is disabled (STORE=0)"}), 503
+    data = request.get_json(silent=True) or {}
+    course, topics = data.get('course'), data.get('topics')
+    if not isinstance(course, str) or not course:
+        return jsonify({"error": "course is required"}), 400
+    if not isinstance(topics, list) or not all(isinstance(t, str) for t in topics):
+        return jsonify({"error": "topics must be a list of strings"}), 400
+    pipeline.store.set_progress(student, course, topics, bool(data.get('completed', True)), data.get('analysis_id'))
+    return jsonify({"student": student, "course": course, "updated": len(topics)})
+
+@app.route('/api/courses/<course>/progress', methods=['GET'])
+@cacheable(PRIVATE_CACHE_CONTROL)
+def get_course_progress(course):
+    """Completed / tracked topic counts per student in a course, for dashboards."""
+    return paginated(lambda limit, offset: pipeline.store.course_progress(course, limit, offset))
+
+# Async mode: POST /api/analyze?async=1 returns a job id right away; a small worker pool
+# (JOB_WORKERS) runs the pipeline, which also caps concurrent Gemini calls from jobs.
+# Opened on first use so routes that never touch jobs don't pay for sqlite3.
+job_queue = None
+job_queue_lock = threading.Lock()
+
+def get_job_queue():
+    global job_queue
+    with job_queue_lock:
+        if job_queue is None:
+            from jobs import build_job_queue
+            job_queue = build_job_queue(UPLOAD_FOLDER, pipeline.run)
+        return job_queue
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+@cacheable(PRIVATE_CACHE_CONTROL)
+def get_job(job_id):
+    """Status of an async analysis: queued/running/done/failed, current stage, result or error"""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found", "job_id": job_id}), 404
+    return jsonify(job)
+
+# Upper bound on syllabi processed (and Gemini calls in flight) at once per batch
+BATCH_MAX_WORKERS = int(os.environ.get('BATCH_MAX_WORKERS', 4))
+BATCH_MAX_FILES = int(os.environ.get('BATCH_MAX_FILES', 50))
+
+@app.route('/api/analyze/batch', methods=['POST'])
+@rate_limited(cost=lambda: max(1, len(request.files.getlist('files') + request.files.getlist('file'))))
+def analyze_batch():
+    """
+    Analyzes several syllabi at once ("files" fields, same weeks/hours/level for all).
+    Streams newline-delimited JSON, one line per file in completion order:
+    {"index", "filename", "result"} or {"index", "filename", "error"}.
+    """
+    print("📥 Received batch analyze request")
+    files = [f for f in request.files.getlist('files') + request.files.getlist('file') if f.filename]
+    if not files:
+        return jsonify({"error": "No files"}), 400
+    if len(files) > BATCH_MAX_FILES:
+        return jsonify({"error": f"Too many files (max {BATCH_MAX_FILES})"}), 400
+
+    # Read everything now; the upload streams are closed once this view returns
+    uploads = [(secure_filename(f.filename), f.read()) for f in files]
+    params = plan_params(request.form)
+
+    def stream():
+        pool = ThreadPoolExecutor(max_workers=min(BATCH_MAX_WORKERS, len(uploads)))
+        try:
+            futures = {pool.submit(pipeline.run, name, data, params): (i, name) for i, (name, data) in enumerate(uploads)}
+            for future in as_completed(futures):
+                index, filename = futures[future]
+                try:
+                    line = {"index": index, "filename": filename, "result": future.result()}
+                except Exception as e:
+                    print(f"🔥 Batch item {filename} failed: {str(e)}")
+                    line = {"index": index, "filename": filename, "error": str(e)}
+                yield json.dumps(line) + "\n"
+            print(f"✅ Batch of {len(uploads)} complete!")
+        finally:
+            # Client went away (or we're done): drop files that haven't started
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    return Response(stream(), mimetype='application/x-ndjson')
+
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
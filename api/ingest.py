@@ -0,0 +1,57 @@
+import hashlib
+import io
+import os
+from tempfile import SpooledTemporaryFile
+
+from flask import Request
+
+import metrics
+
+# Whole request body, enforced by Flask before any of it is parsed (413 above it)
+UPLOAD_MAX_BYTES = int(os.environ.get('UPLOAD_MAX_BYTES', 20 * 1024 * 1024))
+# Each uploaded file stays in memory up to this size, then spills to an anonymous
+# temp file that the OS removes as soon as it is closed
+UPLOAD_SPOOL_BYTES = int(os.environ.get('UPLOAD_SPOOL_BYTES', 4 * 1024 * 1024))
+
+_CHUNK = 64 * 1024
+
+metrics.describe("studyflow_upload_bytes_total", "Bytes of uploaded syllabi read.")
+
+
+class SpoolingRequest(Request):
+    """Flask request whose file uploads are spooled in memory up to UPLOAD_SPOOL_BYTES."""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES, mode='rb+')
+
+
+def is_stream(source):
+    return hasattr(source, 'read')
+
+
+def upload_digest(source):
+    """SHA-256 of the upload's bytes (or of a seekable binary stream, read in chunks and rewound)."""
+    if not is_stream(source):
+        metrics.increment("studyflow_upload_bytes_total", len(source))
+        return hashlib.sha256(source).hexdigest()
+    digest = hashlib.sha256()
+    source.seek(0)
+    size = 0
+    for chunk in iter(lambda: source.read(_CHUNK), b""):
+        digest.update(chunk)
+        size += len(chunk)
+    source.seek(0)
+    metrics.increment("studyflow_upload_bytes_total", size)
+    return digest.hexdigest()
+
+
+def read_text(source):
+    """A text upload decoded as UTF-8 (undecodable bytes dropped), from bytes or a stream."""
+    if not is_stream(source):
+        return source.decode('utf-8', errors='ignore')
+    source.seek(0)
+    reader = io.TextIOWrapper(source, encoding='utf-8', errors='ignore')
+    try:
+        return reader.read()
+    finally:
+        reader.detach()  # the caller owns the stream; closing the wrapper would close it
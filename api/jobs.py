@@ -0,0 +1,186 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    stage TEXT,
+    filename TEXT,
+    params TEXT,
+    data BLOB,
+    result TEXT,
+    error TEXT,
+    owner TEXT,
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created);
+"""
+
+
+class JobQueue:
+    """
+    SQLite-backed job queue with a small pool of worker threads (standing in for Redis).
+
+    `handler(filename, data, params, progress)` runs the work and returns a JSON-able
+    result; it calls `progress(stage)` as it moves through the pipeline. Workers start
+    on the first submit, or as soon as the queue opens or is polled with jobs pending.
+
+    A claimed job carries a lease: its `owner` (this queue instance) and `updated`,
+    which a heartbeat thread refreshes every `lease / 3` seconds. Only running jobs
+    whose lease has expired, i.e. whose process died, are re-queued, so processes
+    sharing the file never run a live sibling's job a second time.
+    """
+
+    def __init__(self, db_path, handler, workers=2, retention=24 * 3600, lease=60):
+        self.db_path = db_path
+        self.handler = handler
+        self.workers = workers
+        self.retention = retention
+        self.lease = lease
+        self.owner = uuid.uuid4().hex
+        self._wake = threading.Condition()
+        self._threads = []
+        self._started = False
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            if "owner" not in {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}:
+                conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+            self._requeue_expired(conn)
+            pending = conn.execute("SELECT 1 FROM jobs WHERE status IN ('queued', 'running') LIMIT 1").fetchone()
+        # Jobs left by a previous process must not wait for the next submit to get a worker
+        if pending:
+            self._ensure_workers()
+
+    def _requeue_expired(self, conn):
+        conn.execute("UPDATE jobs SET status = 'queued', stage = NULL, owner = NULL "
+                     "WHERE status = 'running' AND updated < ?", (time.time() - self.lease,))
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.row_factory = sqlite3.Row
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def submit(self, filename, data, params):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("DELETE FROM jobs WHERE status IN ('done', 'failed') AND updated < ?",
+                         (now - self.retention,))
+            conn.execute("INSERT INTO jobs (id, status, filename, params, data, created, updated) "
+                         "VALUES (?, 'queued', ?, ?, ?, ?, ?)",
+                         (job_id, filename, json.dumps(params), sqlite3.Binary(data), now, now))
+        self._ensure_workers()
+        with self._wake:
+            self._wake.notify()
+        return job_id
+
+    def get(self, job_id):
+        """Status, stage and (once finished) result or error; None for unknown ids."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT id, status, stage, filename, result, error, created, updated "
+                               "FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        if row["status"] in ('queued', 'running'):
+            # Covers jobs whose owner's lease runs out after this queue was opened
+            self._ensure_workers()
+        job = {"id": row["id"], "status": row["status"], "stage": row["stage"],
+               "filename": row["filename"], "created": row["created"], "updated": row["updated"]}
+        if row["result"] is not None:
+            job["result"] = json.loads(row["result"])
+        if row["error"] is not None:
+            job["error"] = row["error"]
+        return job
+
+    def _ensure_workers(self):
+        with self._wake:
+            if self._started:
+                return
+            self._started = True
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            thread = threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _heartbeat(self):
+        """Keeps the leases of this queue's running jobs fresh."""
+        while True:
+            time.sleep(self.lease / 3)
+            try:
+                with self._connect() as conn:
+                    conn.execute("UPDATE jobs SET updated = ? WHERE owner = ? AND status = 'running'",
+                                 (time.time(), self.owner))
+            except sqlite3.Error as e:
+                print(f"⚠️ Job heartbeat failed: {str(e)}")
+
+    def _claim(self):
+        conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            # Write lock up front so two workers (or processes) never pick the same job
+            conn.execute("BEGIN IMMEDIATE")
+            # Jobs of a process that died mid-run become claimable once their lease runs out
+            self._requeue_expired(conn)
+            row = conn.execute("SELECT id, filename, params, data FROM jobs WHERE status = 'queued' "
+                               "ORDER BY created LIMIT 1").fetchone()
+            if row is not None:
+                conn.execute("UPDATE jobs SET status = 'running', owner = ?, updated = ? WHERE id = ?",
+                             (self.owner, time.time(), row["id"]))
+            conn.execute("COMMIT")
+            return row
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _update(self, job_id, **fields):
+        fields["updated"] = time.time()
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def _work(self):
+        while True:
+            try:
+                row = self._claim()
+            except sqlite3.Error as e:
+                print(f"⚠️ Job queue unavailable: {str(e)}")
+                row = None
+            if row is None:
+                with self._wake:
+                    # Timeout also picks up jobs queued by other processes sharing the file
+                    self._wake.wait(timeout=1.0)
+                continue
+            job_id = row["id"]
+            try:
+                result = self.handler(row["filename"], bytes(row["data"]), json.loads(row["params"]),
+                                      lambda stage: self._update(job_id, stage=stage))
+                self._update(job_id, status='done', stage='done', result=json.dumps(result), data=None)
+            except Exception as e:
+                print(f"🔥 Job {job_id} failed: {str(e)}")
+                self._update(job_id, status='failed', error=str(e), data=None)
+
+
+def build_job_queue(upload_folder, handler):
+    return JobQueue(os.path.join(upload_folder, 'jobs.sqlite3'), handler,
+                    workers=int(os.environ.get('JOB_WORKERS', 2)),
+                    retention=int(os.environ.get('JOB_RETENTION', 24 * 3600)),
+                    lease=int(os.environ.get('JOB_LEASE', 60)))
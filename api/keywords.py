@@ -0,0 +1,130 @@
+import json
+import os
+from collections import deque
+from functools import lru_cache
+
+KEYWORDS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'keywords.json')
+
+# Joins a batch of lowercased topics into one string for a single scan; never part of a keyword
+_SEPARATOR = "\n"
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton: finds every keyword occurring as a substring of a text
+    (overlaps included) in one left-to-right pass, however many keywords there are.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        goto = [{}]
+        out = [[]]
+        for kid, keyword in enumerate(self.keywords):
+            state = 0
+            for ch in keyword:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    out.append([])
+                state = nxt
+            out[state].append(kid)
+
+        # Failure links breadth-first, so a state's fallback is complete before its children
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, child in goto[state].items():
+                queue.append(child)
+                fallback = fail[state]
+                while fallback and ch not in goto[fallback]:
+                    fallback = fail[fallback]
+                if state:
+                    fail[child] = goto[fallback].get(ch, 0)
+                out[child] = out[child] + out[fail[child]]
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+
+    def scan(self, texts):
+        """Keyword ids found in each text, in order of where each match ends."""
+        goto, fail, out = self._goto, self._fail, self._out
+        results = [[]]
+        found = results[0]
+        state = 0
+        for ch in _SEPARATOR.join(texts):
+            if ch == _SEPARATOR:
+                found = []
+                results.append(found)
+                state = 0
+                continue
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found.extend(out[state])
+        return results
+
+    def find(self, text):
+        return self.scan([text])[0]
+
+
+class TopicClassifier:
+    """
+    Difficulty (1 easy, 2 medium, 3 hard; hard wins over easy), mentor tip (the first
+    matching entry of `tips`, in file order) and matched keywords for topic titles,
+    all from one automaton over the combined vocabulary.
+    """
+
+    def __init__(self, easy, hard, tips, default_tip):
+        self.tips = dict(tips)
+        self.default_tip = default_tip
+        vocabulary = list(dict.fromkeys([*easy, *hard, *self.tips]))
+        self.matcher = KeywordMatcher(vocabulary)
+        easy, hard = set(easy), set(hard)
+        tip_rank = {keyword: rank for rank, keyword in enumerate(self.tips)}
+        self._easy = [kw in easy for kw in vocabulary]
+        self._hard = [kw in hard for kw in vocabulary]
+        self._tip_rank = [tip_rank.get(kw) for kw in vocabulary]
+        self._tip_text = list(self.tips.values())
+
+    def classify_all(self, topics):
+        """[{"difficulty", "tip", "keywords"}] for each topic, from a single scan of the batch."""
+        if not topics:
+            return []
+        keywords = self.matcher.keywords
+        results = []
+        for ids in self.matcher.scan([t.lower().replace(_SEPARATOR, ' ') for t in topics]):
+            ids = list(dict.fromkeys(ids))
+            difficulty = 3 if any(self._hard[i] for i in ids) else 1 if any(self._easy[i] for i in ids) else 2
+            ranks = [self._tip_rank[i] for i in ids if self._tip_rank[i] is not None]
+            results.append({
+                "difficulty": difficulty,
+                "tip": self._tip_text[min(ranks)] if ranks else self.default_tip,
+                "keywords": [keywords[i] for i in ids],
+            })
+        return results
+
+    def classify(self, topic):
+        return self.classify_all([topic])[0]
+
+
+def load_classifier(path):
+    """
+    TopicClassifier from a JSON file: {"easy": [...], "hard": [...],
+    "tips": {keyword: tip, ...}, "default_tip": "..."}. Keywords are matched lowercase.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    lower = lambda words: [w.lower() for w in words if w]
+    return TopicClassifier(lower(data.get("easy", [])), lower(data.get("hard", [])),
+                           {k.lower(): v for k, v in data.get("tips", {}).items() if k},
+                           data.get("default_tip", ""))
+
+
+@lru_cache(maxsize=None)
+def get_classifier():
+    """The shared classifier for KEYWORDS_FILE (env override), built on first use."""
+    return load_classifier(os.environ.get('KEYWORDS_FILE', KEYWORDS_FILE))
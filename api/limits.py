@@ -0,0 +1,120 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import metrics
+
+
+metrics.describe("studyflow_llm_queued_total", "Gemini calls that had to wait for a slot.")
+metrics.describe("studyflow_llm_rejected_total", "Gemini calls turned away by the concurrency governor.")
+metrics.describe("studyflow_rate_limited_total", "Requests rejected by the per-client rate limit.")
+
+
+class LLMBusy(Exception):
+    """No Gemini slot within the queue deadline; callers fall back to the local path."""
+
+
+class RateLimiter:
+    """
+    Token bucket per client key: `rate` tokens per second, up to `burst` saved up.
+    Only the `max_clients` most recently seen keys are remembered.
+    """
+
+    def __init__(self, rate, burst, max_clients=10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def allow(self, key, cost=1):
+        """(allowed, seconds until the request would be allowed)"""
+        cost = min(cost, self.burst)  # a batch bigger than the burst still gets through when idle
+        with self._lock:
+            now = time.monotonic()
+            tokens, last = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens >= cost:
+                tokens -= cost
+                wait = 0.0
+            else:
+                wait = (cost - tokens) / self.rate
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        return wait == 0.0, wait
+
+
+class LLMGovernor:
+    """
+    Caps in-flight LLM calls at `max_inflight`. A caller waits up to `timeout` seconds
+    for a slot, and is turned away at once (LLMBusy) when the calls queued ahead of it
+    are predicted to take longer than that, so fallbacks happen early instead of
+    after a wasted wait.
+    """
+
+    def __init__(self, max_inflight, timeout):
+        self.max_inflight = max_inflight
+        self.timeout = timeout
+        self.inflight = 0
+        self.waiting = 0
+        self._call_seconds = None  # moving average of recent calls
+        self._cond = threading.Condition()
+
+    def predicted_wait(self):
+        if self._call_seconds is None:
+            return 0.0
+        # Everyone waiting ahead of us, drained max_inflight at a time
+        return math.ceil((self.waiting + 1) / self.max_inflight) * self._call_seconds
+
+    def acquire(self):
+        with self._cond:
+            if self.inflight < self.max_inflight and not self.waiting:
+                self.inflight += 1
+                return
+            if self.predicted_wait() > self.timeout:
+                metrics.increment("studyflow_llm_rejected_total", reason="predicted")
+                raise LLMBusy(f"{self.waiting} LLM calls queued, expected wait over {self.timeout:g}s")
+            metrics.increment("studyflow_llm_queued_total")
+            self.waiting += 1
+            deadline = time.monotonic() + self.timeout
+            try:
+                while self.inflight >= self.max_inflight:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        metrics.increment("studyflow_llm_rejected_total", reason="timeout")
+                        raise LLMBusy(f"no LLM slot within {self.timeout:g}s")
+                    self._cond.wait(remaining)
+            finally:
+                self.waiting -= 1
+            self.inflight += 1
+
+    def release(self, seconds=None):
+        with self._cond:
+            self.inflight -= 1
+            if seconds is not None:
+                self._call_seconds = seconds if self._call_seconds is None else 0.8 * self._call_seconds + 0.2 * seconds
+            self._cond.notify()
+
+
+def build_llm_governor():
+    """LLM_MAX_INFLIGHT concurrent Gemini calls per process (0 = unlimited), LLM_QUEUE_TIMEOUT seconds of queueing."""
+    max_inflight = int(os.environ.get('LLM_MAX_INFLIGHT', 4))
+    if max_inflight <= 0:
+        return None
+    governor = LLMGovernor(max_inflight, float(os.environ.get('LLM_QUEUE_TIMEOUT', 5)))
+    metrics.register_gauge("studyflow_llm_inflight", lambda: [({}, governor.inflight)],
+                           "Gemini calls currently in flight.")
+    metrics.register_gauge("studyflow_llm_waiting", lambda: [({}, governor.waiting)],
+                           "Gemini calls waiting for a slot.")
+    return governor
+
+
+def build_rate_limiter():
+    """RATE_LIMIT_PER_MINUTE requests per client (0 disables), bursts up to RATE_LIMIT_BURST."""
+    per_minute = float(os.environ.get('RATE_LIMIT_PER_MINUTE', 30))
+    if per_minute <= 0:
+        return None
+    return RateLimiter(per_minute / 60, int(os.environ.get('RATE_LIMIT_BURST', 10)))
@@ -0,0 +1,144 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+QUANTILES = (0.5, 0.95, 0.99)
+# Percentiles are computed over this many most recent samples per series
+WINDOW = 1024
+
+_lock = threading.Lock()
+_latencies = {}  # (metric, labels) -> {"window": deque, "sum": float, "count": int}
+_counters = {}   # (metric, labels) -> float
+_gauges = {}     # name -> callable returning [(labels, value), ...]
+_HELP = {}
+
+# Spans recorded while serving the current request, for the Server-Timing header
+_request_spans = ContextVar('request_spans', default=None)
+
+
+def _labels(labels):
+    return tuple(sorted(labels.items()))
+
+
+def observe(metric, seconds, **labels):
+    key = (metric, _labels(labels))
+    with _lock:
+        series = _latencies.get(key)
+        if series is None:
+            series = _latencies[key] = {"window": deque(maxlen=WINDOW), "sum": 0.0, "count": 0}
+        series["window"].append(seconds)
+        series["sum"] += seconds
+        series["count"] += 1
+
+
+def increment(metric, amount=1, **labels):
+    key = (metric, _labels(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def register_gauge(name, collect, help_text=""):
+    """`collect()` returns [(labels_dict, value), ...] each time /api/metrics is scraped."""
+    _gauges[name] = collect
+    if help_text:
+        _HELP[name] = help_text
+
+
+def describe(metric, help_text):
+    _HELP[metric] = help_text
+
+
+@contextmanager
+def span(stage):
+    """Times a pipeline stage (or LLM call) into studyflow_stage_seconds{stage=...}."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        observe("studyflow_stage_seconds", elapsed, stage=stage)
+        spans = _request_spans.get()
+        if spans is not None:
+            spans.append((stage, elapsed))
+
+
+def start_request():
+    _request_spans.set([])
+
+
+def server_timing():
+    """Server-Timing header value for the spans of the current request."""
+    spans = _request_spans.get() or []
+    totals = {}
+    for stage, elapsed in spans:
+        totals[stage] = totals.get(stage, 0.0) + elapsed
+    return ", ".join(f"{stage.replace('.', '_')};dur={elapsed * 1000:.1f}" for stage, elapsed in totals.items())
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summary():
+    """Percentiles per series, for logs and benchmarks."""
+    with _lock:
+        items = [(k, sorted(v["window"]), v["count"]) for k, v in _latencies.items()]
+    return {f"{metric}{dict(labels)}": {"count": count, **{f"p{int(q * 100)}": percentile(values, q)
+                                                           for q in QUANTILES}}
+            for (metric, labels), values, count in items}
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{str(v)}"' for k, v in pairs) + "}"
+
+
+def render_prometheus():
+    """All series in the Prometheus text exposition format."""
+    with _lock:
+        latencies = [(k, sorted(v["window"]), v["sum"], v["count"]) for k, v in _latencies.items()]
+        counters = list(_counters.items())
+
+    lines = []
+    seen = set()
+
+    def header(metric, kind):
+        if metric not in seen:
+            seen.add(metric)
+            if metric in _HELP:
+                lines.append(f"# HELP {metric} {_HELP[metric]}")
+            lines.append(f"# TYPE {metric} {kind}")
+
+    for (metric, labels), values, total, count in sorted(latencies):
+        header(metric, "summary")
+        for q in QUANTILES:
+            lines.append(f"{metric}{_format_labels(labels, [('quantile', q)])} {percentile(values, q):.6f}")
+        lines.append(f"{metric}_sum{_format_labels(labels)} {total:.6f}")
+        lines.append(f"{metric}_count{_format_labels(labels)} {count}")
+
+    for (metric, labels), value in sorted(counters):
+        header(metric, "counter")
+        lines.append(f"{metric}{_format_labels(labels)} {value}")
+
+    for metric, collect in sorted(_gauges.items()):
+        try:
+            values = collect()
+        except Exception as e:
+            print(f"⚠️ Gauge {metric} failed: {str(e)}")
+            continue
+        header(metric, "gauge")
+        for labels, value in values:
+            lines.append(f"{metric}{_format_labels(_labels(labels))} {value}")
+
+    return "\n".join(lines) + "\n"
+
+
+describe("studyflow_stage_seconds", "Duration of analyze pipeline stages and LLM calls.")
+describe("studyflow_request_seconds", "Duration of API requests by route.")
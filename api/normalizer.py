@@ -0,0 +1,90 @@
+import re
+
+HEADER_WORDS = ["UNIT", "MODULE", "CHAPTER", "TOPIC", "SECTION", "PART", "LESSON", "ROMAN", "WEEK", "SESSION"]
+ROMAN_NUMERALS = ["IX", "IV", "VIII", "VII", "VI", "V", "III", "II", "I"]
+SUFFIX_WORDS = ["Syllabus", "Notes", "Course", "University", "Credit", "Instructor", "Hours",
+                "Question Bank", "Extra Questions", "Important Questions", "Question Paper",
+                "Objective", "Summary", "Module", "Unit", "Chapter", "Topic"]
+# Phrases that mean the model talked about the list instead of returning a topic
+CHATTER_PHRASES = ["you said", "here are", "identified", "topics", "content of", "syllabus for"]
+
+
+def _alternation(words):
+    # Longest first so "Question Bank" wins over a shorter prefix
+    return "|".join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+
+
+# Leading bullets, numbering, "UNIT 2:", roman numerals and other junk, in any combination.
+_PREFIX = re.compile(
+    r"^(?:[^A-Za-z0-9]+"
+    r"|[\d.\-*•]+(?:\s+|$)"
+    # A header word only counts when a number, roman numeral or colon follows it, so
+    # "Session Management" and "Part-of-speech tagging" keep their first word
+    r"|(?:" + _alternation(HEADER_WORDS) + r")\s*(?=[\-.]?\d|:|(?:" + _alternation(ROMAN_NUMERALS) + r")\b)"
+    r"(?:(?:" + _alternation(ROMAN_NUMERALS) + r")\b)?[\d.\-:]*\s*"
+    # Likewise a bare roman numeral needs a separator or number after it ("IV. Trees",
+    # "II: Graphs"), so "I/O Systems" and "Vi editor basics" stay whole
+    r"|(?:" + _alternation(ROMAN_NUMERALS) + r")(?=\s*[.):\-]|\s*\d)[\s\d.):\-]*)+",
+    re.IGNORECASE)
+_SUFFIX = re.compile(r"\s*\b(?:" + _alternation(SUFFIX_WORDS) + r")\s*$", re.IGNORECASE)
+# Cheap endswith test so the suffix regex only runs on titles that can match it
+_SUFFIX_ENDINGS = tuple(w.lower() for w in SUFFIX_WORDS)
+_COURSE_CODE = r"[A-Z]{2,}\d{3,}[A-Z]*"
+# Matched against the lowercased title, which is faster than an IGNORECASE scan
+_CHATTER = re.compile(_alternation(CHATTER_PHRASES))
+
+# Fallback: which raw document lines look like topic headings
+_TOPIC_LINE = re.compile(r"^(?:(?i:UNIT|MODULE|CHAPTER|TOPIC|SECTION)\s|[\d.\-*•]+\s+[A-Z])")
+
+
+class TopicNormalizer:
+    """
+    Cleans candidate topic titles with precompiled patterns.
+    Shared by the Gemini path (model output) and the regex fallback (document lines),
+    so both produce titles in the same shape.
+    """
+
+    def __init__(self, subject="", drop_chatter=True, min_length=4):
+        self.drop_chatter = drop_chatter
+        self.min_length = min_length
+        anywhere = [_COURSE_CODE]
+        subject = (subject or "").strip()
+        if len(subject) > 3:
+            anywhere.insert(0, "(?i:" + re.escape(subject) + ")")
+        self._anywhere = re.compile("|".join(anywhere))
+
+    def clean(self, topic):
+        """Returns the cleaned, capitalized title, or None when nothing useful is left."""
+        t = self._anywhere.sub('', str(topic))
+        t = _PREFIX.sub('', t.strip())
+        if t.rstrip().lower().endswith(_SUFFIX_ENDINGS):
+            t = _SUFFIX.sub('', t)
+        t = " ".join(t.split())
+        if len(t) < self.min_length:
+            return None
+        if self.drop_chatter and _CHATTER.search(t.lower()):
+            return None
+        return t.capitalize()
+
+    def normalize(self, topics, limit=None):
+        """Cleans a batch of titles, dropping empties and duplicates while keeping order."""
+        seen = set()
+        result = []
+        for topic in topics:
+            t = self.clean(topic)
+            if t and t not in seen:
+                seen.add(t)
+                result.append(t)
+                if limit is not None and len(result) >= limit:
+                    break
+        return result
+
+
+def topic_lines(text):
+    """Lines of a cleaned document that look like topic headings."""
+    for line in text.split('\n'):
+        line = line.strip()
+        if len(line) < 5:
+            continue
+        if _TOPIC_LINE.match(line) or (line[0].isupper() and len(line) < 80):
+            yield line
@@ -0,0 +1,159 @@
+"""
+Units -> topics -> subtopics from a cleaned syllabus, in one pass over its lines.
+
+    UNIT II: SEARCH AND PROBLEM SOLVING      unit
+    2.1 Uninformed Search                    topic
+    2.1.1 Breadth-first search               subtopic
+    - Depth-first search                     subtopic
+    Heuristics: greedy, A*, IDA*             topic with subtopics
+
+Lines before the first unit header only form a unit of their own when the document
+has no headers at all; other prose lines only count towards their unit's text span.
+"""
+import re
+from bisect import bisect_right
+
+from dependencies import STOP_WORDS
+from normalizer import TopicNormalizer
+
+_UNIT_HEADER = re.compile(r"^(?:UNIT|MODULE|CHAPTER|PART)\s*(?:\d+|[IVXLC]+)\b[\s.:\-]*(.*)$", re.IGNORECASE)
+_NUMBERED = re.compile(r"^(\d+(?:\.\d+)*)\.?\)?\s+(\S.*)$")
+_BULLET = re.compile(r"^-+\s*(\S.*)$")
+_INLINE_LIST = re.compile(r"^([^:]{3,60}):\s*(.+[,;].+)$")
+_WORD = re.compile(r"\w+")
+
+# A plain line is a topic when it reads like a heading: capitalized and short
+HEADING_MAX_CHARS = 80
+
+
+def _unit(title, start):
+    return {"title": title, "span": [start, start], "topics": []}
+
+
+def build_outline(text, normalizer=None):
+    """
+    [{"title", "span": [start, end) of the unit in `text`, "topics": [{"title", "subtopics"}]}].
+    Titles are cleaned by `normalizer` (a fallback-style TopicNormalizer by default);
+    duplicate titles within a unit are dropped.
+    """
+    normalizer = normalizer or TopicNormalizer(drop_chatter=False, min_length=3)
+    preamble = unit = _unit("", 0)
+    units = []
+    topic = None
+    seen = set()
+
+    def add_topic(raw, subtopics=()):
+        nonlocal topic
+        title = normalizer.clean(raw)
+        if not title or title in seen:
+            return
+        seen.add(title)
+        topic = {"title": title, "subtopics": normalizer.normalize(subtopics)}
+        unit["topics"].append(topic)
+
+    def add_subtopic(raw):
+        title = normalizer.clean(raw)
+        if title and title not in topic["subtopics"]:
+            topic["subtopics"].append(title)
+
+    start = 0
+    length = len(text)
+    while start < length:
+        end = text.find('\n', start)
+        if end == -1:
+            end = length
+        line = text[start:end].strip()
+        if len(line) >= 3:
+            header = _UNIT_HEADER.match(line)
+            if header:
+                unit["span"][1] = start
+                unit = _unit(normalizer.clean(header.group(1)) or " ".join(line.split()[:2]).title(), start)
+                units.append(unit)
+                topic = None
+                seen = set()
+            else:
+                numbered = _NUMBERED.match(line)
+                bullet = None if numbered else _BULLET.match(line)
+                inline = _INLINE_LIST.match(line)
+                if numbered and numbered.group(1).count('.') >= 2 and topic:
+                    add_subtopic(numbered.group(2))
+                elif bullet and topic:
+                    add_subtopic(bullet.group(1))
+                elif inline:
+                    add_topic(inline.group(1), re.split(r"[,;]", inline.group(2)))
+                elif numbered or bullet:
+                    add_topic((numbered or bullet).group(2 if numbered else 1))
+                elif line[0].isupper() and len(line) < HEADING_MAX_CHARS:
+                    add_topic(line)
+        start = end + 1
+    unit["span"][1] = length
+
+    if not units:
+        preamble["title"] = "Course"
+        units = [preamble]
+    return units
+
+
+def outline_topics(units):
+    """The units' topic titles in document order, each once."""
+    return list(dict.fromkeys(t["title"] for unit in units for t in unit["topics"]))
+
+
+def _words(text):
+    return {w for w in _WORD.findall(text.lower()) if w not in STOP_WORDS}
+
+
+def assign_units(topics, units, text):
+    """
+    Unit index per topic: the unit whose text first mentions the title (case-insensitive),
+    else the unit sharing the most words with it, counting its outline (topic titles and
+    subtopics) before the rest of its span. A topic sharing no word with any unit
+    follows the previous one, since extracted topics follow the document.
+    """
+    starts = [unit["span"][0] for unit in units]
+    lowered = text.lower()
+    outline_words = [_words(" ".join(t["title"] + " " + " ".join(t["subtopics"]) for t in unit["topics"]))
+                     for unit in units]
+    span_words = None
+    result = []
+    previous = 0
+    for topic in topics:
+        found = lowered.find(topic.lower())
+        if found != -1:
+            previous = max(bisect_right(starts, found) - 1, 0)
+        else:
+            words = _words(topic)
+            if span_words is None:
+                span_words = [_words(text[start:end]) for start, end in (unit["span"] for unit in units)]
+            score, best = max(((len(words & outline_words[k]), len(words & span_words[k])), -k)
+                              for k in range(len(units)))
+            if score != (0, 0):
+                previous = -best
+        result.append(previous)
+    return result
+
+
+def attach_topics(topics, units, text, seen_chars=None):
+    """
+    (topics, units) with each topic filed under a unit: units become
+    {"title", "span", "outline": their parsed topics, "topics": [indices into topics]}.
+    When the topics came from only the first `seen_chars` characters of `text` (the
+    model's prompt), units starting past that point contribute their outlined topics,
+    appended to `topics`, so long syllabi are never cut short.
+    """
+    topics = list(topics)
+    members = [[] for _ in units]
+    for i, unit_index in enumerate(assign_units(topics, units, text)):
+        members[unit_index].append(i)
+    if seen_chars is not None:
+        known = set(topics)
+        for unit_index, unit in enumerate(units):
+            if unit["span"][0] < seen_chars:
+                continue
+            for t in unit["topics"]:
+                if t["title"] not in known:
+                    known.add(t["title"])
+                    members[unit_index].append(len(topics))
+                    topics.append(t["title"])
+    return topics, [{"title": unit["title"], "span": unit["span"], "outline": unit["topics"], "topics": members[k]}
+                    for k, unit in enumerate(units)]
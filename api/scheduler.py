@@ -0,0 +1,126 @@
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+
+# Estimated study hours per topic by difficulty (1 easy .. 3 hard), per student level.
+# Beginners spend extra time on foundations; advanced students skim basics.
+LEVEL_HOURS = {
+    "Beginner": {1: 2.5, 2: 3, 3: 4},
+    "Intermediate": {1: 1, 2: 2, 3: 3},
+    "Advanced": {1: 0.5, 2: 1.5, 3: 3},
+}
+
+
+def topic_hours(ordered_topics, topic_details, level):
+    weights = LEVEL_HOURS.get(level, LEVEL_HOURS["Intermediate"])
+    return [weights.get(topic_details[t]["difficulty"], 2) for t in ordered_topics]
+
+
+def _blocks(prefix, start, stop, cap, max_blocks):
+    """
+    Greedy contiguous split of items [start, stop) into blocks of load <= cap (a single
+    item heavier than cap still gets a block of its own). Stops after max_blocks.
+    Returns (block end indices, heaviest block load).
+    """
+    ends, heaviest = [], 0.0
+    cap += 1e-9  # a load found by an earlier probe must fit again despite float rounding
+    i = start
+    while i < stop and len(ends) < max_blocks:
+        end = max(i + 1, min(bisect_right(prefix, prefix[i] + cap, i, stop + 1) - 1, stop))
+        heaviest = max(heaviest, prefix[end] - prefix[i])
+        ends.append(end)
+        i = end
+    return ends, heaviest
+
+
+def _balanced_blocks(prefix, n, k, cap):
+    """
+    Exactly min(k, n) blocks of load <= cap (cap must be feasible), each ending as close
+    as possible to an even share of what is left. starts[j] is the earliest point
+    from which the last j blocks can still take everything, filled from the right.
+    """
+    cap += 1e-9
+    starts = [n]
+    for _ in range(k - 1):
+        starts.append(max(0, bisect_left(prefix, prefix[starts[-1]] - cap)))
+    ends, heaviest = [], 0.0
+    i = 0
+    for left in range(k, 0, -1):
+        if left == 1:
+            end = n
+        else:
+            latest = min(bisect_right(prefix, prefix[i] + cap, i, n + 1) - 1, n - (left - 1))
+            earliest = max(i + 1, starts[left - 1])
+            target = prefix[i] + (prefix[n] - prefix[i]) / left
+            end = min(max(bisect_left(prefix, target, i, n + 1), earliest), latest)
+            if end > earliest and target - prefix[end - 1] < prefix[end] - target:
+                end -= 1
+        heaviest = max(heaviest, prefix[end] - prefix[i])
+        ends.append(end)
+        i = end
+    return ends, heaviest
+
+
+def min_max_partition(weights, k):
+    """
+    Splits `weights` (in order) into at most k contiguous blocks minimizing the heaviest
+    block. Binary search on the capacity; each probe is a greedy split costing
+    O(k log n) via prefix sums, and a feasible probe lowers the bound to the load it
+    actually achieved, so the result is exact. Weeks are then evened out under that
+    bound. Returns (block end indices, heaviest load).
+    """
+    n = len(weights)
+    if n == 0:
+        return [], 0.0
+    k = max(1, min(k, n))
+    prefix = list(accumulate(map(float, weights), initial=0.0))
+    lo = max(max(weights), prefix[-1] / k)
+    hi = prefix[-1]
+    ends, best = _blocks(prefix, 0, n, lo, k)
+    if ends[-1] == n:
+        hi = best
+    else:
+        tolerance = prefix[-1] * 1e-9
+        while hi - lo > tolerance:
+            mid = (lo + hi) / 2
+            ends, heaviest = _blocks(prefix, 0, n, mid, k)
+            if ends[-1] == n:
+                hi = heaviest
+            else:
+                lo = mid
+    return _balanced_blocks(prefix, n, k, hi)
+
+
+def build_schedule(ordered_topics, topic_details, weeks, hours, level, first_week=1):
+    """
+    Packs the ordered topics into `weeks` contiguous weeks with the lightest possible
+    heaviest week. `hours` per week is a hard cap (<= 0 means uncapped): whatever
+    doesn't fit in the horizon is reported as overflow instead of being piled onto
+    the last week. A single topic longer than the cap gets a week to itself.
+    Weeks are numbered from `first_week` (re-planning the rest of a running plan).
+
+    Returns {"weeks": [{"week", "topics", "hours"}], "overflow": None or
+    {"topics", "hours", "extra_weeks"}, "max_week_hours"}.
+    """
+    weeks = max(1, int(weeks))
+    loads = topic_hours(ordered_topics, topic_details, level)
+    prefix = list(accumulate(map(float, loads), initial=0.0))
+    n = len(ordered_topics)
+
+    ends, heaviest = min_max_partition(loads, weeks)
+    overflow = None
+    if hours > 0 and heaviest > hours:
+        # Can't be balanced under the cap: fill weeks up to the cap, carry the rest over
+        ends, _ = _blocks(prefix, 0, n, hours, weeks)
+        done = ends[-1] if ends else 0
+        if done < n:
+            extra, _ = _blocks(prefix, done, n, hours, n)
+            overflow = {"topics": ordered_topics[done:], "hours": round(prefix[n] - prefix[done], 2),
+                        "extra_weeks": len(extra)}
+
+    schedule, start = [], 0
+    for w, end in enumerate(ends, first_week):
+        schedule.append({"week": w, "topics": ordered_topics[start:end],
+                         "hours": round(prefix[end] - prefix[start], 2)})
+        start = end
+    return {"weeks": schedule, "overflow": overflow,
+            "max_week_hours": max((w["hours"] for w in schedule), default=0)}
@@ -0,0 +1,251 @@
+"""
+Server-side persistence for analyses, schedules and per-student topic completion.
+
+StudyStore is the interface the API talks to; SQLiteStore keeps everything in one
+WAL-mode SQLite file. Another backend (Postgres, a hosted KV, ...) only has to
+implement the same methods and be returned from build_store.
+
+List methods take `limit` / `offset` and return (items, has_more), so callers can
+page through thousands of students without loading full analyses.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    id TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    filename TEXT,
+    course TEXT,
+    topic_count INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS analyses_content_hash ON analyses (content_hash);
+CREATE INDEX IF NOT EXISTS analyses_course_created ON analyses (course, created);
+
+CREATE TABLE IF NOT EXISTS schedules (
+    id TEXT PRIMARY KEY,
+    analysis_id TEXT,
+    student TEXT NOT NULL,
+    course TEXT,
+    params TEXT NOT NULL,
+    data TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS schedules_student_course ON schedules (student, course, created);
+CREATE INDEX IF NOT EXISTS schedules_analysis ON schedules (analysis_id);
+
+CREATE TABLE IF NOT EXISTS progress (
+    student TEXT NOT NULL,
+    course TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    analysis_id TEXT,
+    completed INTEGER NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (student, course, topic)
+);
+CREATE INDEX IF NOT EXISTS progress_course_student ON progress (course, student);
+"""
+
+# Fields of an analysis that are persisted; the cleaned text stays for expanding units later
+ANALYSIS_FIELDS = ("text", "topics", "ordered_topics", "topic_details", "adjacency", "order", "cycles", "units")
+
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def page_bounds(limit, offset):
+    """(limit, offset) clamped to 1..MAX_PAGE_SIZE and >= 0; raises ValueError on non-integers."""
+    limit = PAGE_SIZE if limit in (None, "") else int(limit)
+    offset = 0 if offset in (None, "") else int(offset)
+    return min(max(limit, 1), MAX_PAGE_SIZE), max(offset, 0)
+
+
+class StudyStore:
+    """The persistence interface. Every method may raise the backend's own errors."""
+
+    def save_analysis(self, analysis, content_hash, filename=None, course=None, replace=True):
+        """
+        Insert or replace an analysis (a StudyPlanPipeline.analyze result) under its "id".
+        With replace=False an existing row is left untouched.
+        """
+        raise NotImplementedError
+
+    def get_analysis(self, analysis_id):
+        """The stored analysis fields plus "id", or None."""
+        raise NotImplementedError
+
+    def list_analyses(self, content_hash=None, course=None, limit=PAGE_SIZE, offset=0):
+        """Summaries (no topics or graph), newest first."""
+        raise NotImplementedError
+
+    def set_analysis_course(self, analysis_id, course):
+        """Files a stored analysis under a course."""
+        raise NotImplementedError
+
+    def save_schedule(self, student, schedule, params, analysis_id=None, course=None):
+        """Records a generated schedule for a student; returns its id."""
+        raise NotImplementedError
+
+    def list_schedules(self, student, course=None, limit=PAGE_SIZE, offset=0):
+        raise NotImplementedError
+
+    def set_progress(self, student, course, topics, completed=True, analysis_id=None):
+        """Marks `topics` completed (or not) for a student in a course."""
+        raise NotImplementedError
+
+    def get_progress(self, student, course=None, limit=PAGE_SIZE, offset=0):
+        raise NotImplementedError
+
+    def completed_topics(self, student, course):
+        """Set of topics the student has completed in the course."""
+        raise NotImplementedError
+
+    def course_progress(self, course, limit=PAGE_SIZE, offset=0):
+        """Per-student completed-topic counts for a course, by student id."""
+        raise NotImplementedError
+
+
+class SQLiteStore(StudyStore):
+    """
+    StudyStore in a SQLite file in WAL mode, so dashboards can read while analyses are
+    written. sqlite3 is imported and the schema created on first use, keeping it off
+    the import path of routes that never persist anything.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._ready = False
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _connect(self):
+        import sqlite3
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.row_factory = sqlite3.Row
+            if not self._ready:
+                with self._lock:
+                    if not self._ready:
+                        conn.executescript(SCHEMA)
+                        self._ready = True
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _page(rows, limit):
+        return rows[:limit], len(rows) > limit
+
+    def save_analysis(self, analysis, content_hash, filename=None, course=None, replace=True):
+        with self._connect() as conn:
+            if not replace and conn.execute("SELECT 1 FROM analyses WHERE id = ?", (analysis["id"],)).fetchone():
+                return
+            now = time.time()
+            data = json.dumps({field: analysis[field] for field in ANALYSIS_FIELDS if field in analysis})
+            # Keep the original creation time (and course, unless a new one is given) on re-analysis
+            conn.execute("INSERT INTO analyses (id, content_hash, filename, course, topic_count, data, created, updated) "
+                         "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                         "ON CONFLICT (id) DO " + ("UPDATE SET filename = excluded.filename, "
+                         "course = COALESCE(excluded.course, analyses.course), topic_count = excluded.topic_count, "
+                         "data = excluded.data, updated = excluded.updated" if replace else "NOTHING"),
+                         (analysis["id"], content_hash, filename, course, len(analysis["topics"]), data, now, now))
+
+    def get_analysis(self, analysis_id):
+        with self._connect() as conn:
+            row = conn.execute("SELECT id, data FROM analyses WHERE id = ?", (analysis_id,)).fetchone()
+        if row is None:
+            return None
+        return {"id": row["id"], **json.loads(row["data"])}
+
+    def list_analyses(self, content_hash=None, course=None, limit=PAGE_SIZE, offset=0):
+        where, args = [], []
+        if content_hash:
+            where.append("content_hash = ?")
+            args.append(content_hash)
+        if course:
+            where.append("course = ?")
+            args.append(course)
+        sql = ("SELECT id, content_hash, filename, course, topic_count, created, updated FROM analyses"
+               + (" WHERE " + " AND ".join(where) if where else "")
+               + " ORDER BY created DESC, id LIMIT ? OFFSET ?")
+        with self._connect() as conn:
+            rows = conn.execute(sql, (*args, limit + 1, offset)).fetchall()
+        return self._page([dict(r) for r in rows], limit)
+
+    def set_analysis_course(self, analysis_id, course):
+        with self._connect() as conn:
+            conn.execute("UPDATE analyses SET course = ? WHERE id = ?", (course, analysis_id))
+
+    def save_schedule(self, student, schedule, params, analysis_id=None, course=None):
+        schedule_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute("INSERT INTO schedules (id, analysis_id, student, course, params, data, created) "
+                         "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         (schedule_id, analysis_id, student, course, json.dumps(params), json.dumps(schedule),
+                          time.time()))
+        return schedule_id
+
+    def list_schedules(self, student, course=None, limit=PAGE_SIZE, offset=0):
+        sql = "SELECT id, analysis_id, student, course, params, data, created FROM schedules WHERE student = ?"
+        args = [student]
+        if course:
+            sql += " AND course = ?"
+            args.append(course)
+        with self._connect() as conn:
+            rows = conn.execute(sql + " ORDER BY created DESC, id LIMIT ? OFFSET ?",
+                                (*args, limit + 1, offset)).fetchall()
+        items = [{"id": r["id"], "analysis_id": r["analysis_id"], "student": r["student"], "course": r["course"],
+                  "params": json.loads(r["params"]), "schedule": json.loads(r["data"]), "created": r["created"]}
+                 for r in rows]
+        return self._page(items, limit)
+
+    def set_progress(self, student, course, topics, completed=True, analysis_id=None):
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany("INSERT INTO progress (student, course, topic, analysis_id, completed, updated) "
+                             "VALUES (?, ?, ?, ?, ?, ?) "
+                             "ON CONFLICT (student, course, topic) DO UPDATE SET completed = excluded.completed, "
+                             "analysis_id = COALESCE(excluded.analysis_id, progress.analysis_id), "
+                             "updated = excluded.updated",
+                             [(student, course, t, analysis_id, int(completed), now) for t in topics])
+
+    def get_progress(self, student, course=None, limit=PAGE_SIZE, offset=0):
+        sql = "SELECT course, topic, analysis_id, completed, updated FROM progress WHERE student = ?"
+        args = [student]
+        if course:
+            sql += " AND course = ?"
+            args.append(course)
+        with self._connect() as conn:
+            rows = conn.execute(sql + " ORDER BY course, topic LIMIT ? OFFSET ?",
+                                (*args, limit + 1, offset)).fetchall()
+        return self._page([{**dict(r), "completed": bool(r["completed"])} for r in rows], limit)
+
+    def completed_topics(self, student, course):
+        with self._connect() as conn:
+            rows = conn.execute("SELECT topic FROM progress WHERE student = ? AND course = ? AND completed = 1",
+                                (student, course)).fetchall()
+        return {r["topic"] for r in rows}
+
+    def course_progress(self, course, limit=PAGE_SIZE, offset=0):
+        with self._connect() as conn:
+            rows = conn.execute("SELECT student, SUM(completed) AS completed, COUNT(*) AS tracked, "
+                                "MAX(updated) AS updated FROM progress WHERE course = ? "
+                                "GROUP BY student ORDER BY student LIMIT ? OFFSET ?",
+                                (course, limit + 1, offset)).fetchall()
+        return self._page([dict(r) for r in rows], limit)
+
+
+def build_store(upload_folder):
+    """SQLite store under the upload folder (STORE_PATH overrides), or None with STORE=0."""
+    if os.environ.get('STORE', '1') == '0':
+        return None
+    return SQLiteStore(os.environ.get('STORE_PATH') or os.path.join(upload_folder, 'studyflow.sqlite3'))
@@ -0,0 +1,88 @@
+"""
+Benchmark for the mentor chat answer cache: lookup latency with 1k / 10k cached answers.
+
+    python benchmarks/bench_chat_cache.py [--sizes 1000 10000]
+
+Before timing, known question pairs are checked: paraphrases and inflections
+("what is A* search" / "explain A star", "merge sort" / "merge sorting") must
+share an answer, and different questions ("bfs and dfs" / "bfs and ucs") must
+not. Exits 1 when any check fails.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', 'api'))
+sys.path.insert(0, HERE)
+from chat_cache import ChatCache  # noqa: E402
+from synthetic import syllabus_topics  # noqa: E402
+
+# (topic, cached question, asked question, should hit)
+PAIRS = [
+    ("A* Search", "what is A* search", "explain A star", True),
+    ("A* Search", "define A* search", "meaning of A star", True),
+    ("Algorithms", "explain merge sort", "explain merge sorting", True),
+    ("Data Structures", "compare graphs and trees", "compare graph and trees", True),
+    ("Data Structures", "how do heaps work", "how does a heap work", True),
+    ("Complexity", "why are greedy algorithms fast", "why are greedy algorithm fast", True),
+    ("Search", "difference between bfs and dfs", "differences between dfs and bfs", True),
+    ("Search", "bfs and dfs", "bfs and ucs", False),
+    ("Search", "give an example", "why?", False),
+    ("Search", "what is it?", "what is it?", False),
+    ("A* Search", "what is A* search", "why is A* search optimal", False),
+]
+
+QUESTIONS = ["what is {t}", "explain {t} with an example", "why is {t} useful",
+             "difference between {t} and {u}", "how does {t} work in practice"]
+
+
+def check_pairs():
+    failures = 0
+    for topic, cached, asked, hit in PAIRS:
+        cache = ChatCache()
+        cache.set(topic, cached, "answer")
+        got = cache.get(topic, asked) == "answer"
+        failures += got != hit
+        print(f"  {'ok ' if got == hit else 'BAD'} [{topic}] {cached!r} -> {asked!r}: {'hit' if got else 'miss'}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    args = parser.parse_args()
+
+    print("Question pairs")
+    failures = check_pairs()
+
+    print(f"\n{'answers':>8} {'lookups':>8} {'hit':>10} {'near hit':>10} {'miss':>10}")
+    rng = random.Random(5)
+    for n in args.sizes:
+        topics = syllabus_topics(max(1, n // len(QUESTIONS)))
+        cache = ChatCache(max_entries=n)
+        asked = []
+        for topic in topics:
+            for q in QUESTIONS:
+                question = q.format(t=topic.split()[-1].lower(), u=rng.choice(topics).lower())
+                cache.set(topic, question, "answer")
+                asked.append((topic, question))
+        lookups = min(len(asked), 2000)
+        sample = rng.sample(asked, lookups)
+        row = []
+        for variant in (lambda q: q, lambda q: q + "s", lambda q: q + " zzqx"):
+            start = time.perf_counter()
+            for topic, question in sample:
+                cache.get(topic, variant(question))
+            row.append((time.perf_counter() - start) / lookups * 1e6)
+        print(f"{len(asked):>8} {lookups:>8} " + " ".join(f"{us:>8.1f}us" for us in row))
+
+    if failures:
+        print(f"\n{failures} question pair check(s) failed")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
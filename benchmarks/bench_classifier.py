@@ -0,0 +1,73 @@
+"""
+Benchmark for topic classification (difficulty + mentor tip) at 35 / 1k / 10k topics.
+
+    python benchmarks/bench_classifier.py [--sizes 35 1000 10000] [--vocab 0 5000]
+
+The Aho-Corasick classifier is checked against the previous per-keyword `in`
+scans (same difficulty and tip for every topic), with the shipped keyword file
+and with it padded to --vocab extra synthetic keywords.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', 'api'))
+sys.path.insert(0, HERE)
+from keywords import KEYWORDS_FILE, TopicClassifier  # noqa: E402
+from synthetic import syllabus_topics  # noqa: E402
+
+
+def legacy_classify(topics, easy, hard, tips, default_tip):
+    results = []
+    for topic in topics:
+        t_lower = topic.lower()
+        score = 2
+        if any(kw in t_lower for kw in easy): score = 1
+        if any(kw in t_lower for kw in hard): score = 3
+        tip = next((text for key, text in tips.items() if key in t_lower), default_tip)
+        results.append((score, tip))
+    return results
+
+
+def keyword_tables(extra, seed=9):
+    """The shipped keyword file plus `extra` made-up keywords split across easy/hard/tips."""
+    with open(KEYWORDS_FILE, encoding='utf-8') as f:
+        data = json.load(f)
+    rng = random.Random(seed)
+    words = sorted({f"{rng.choice('bcdfgkmpstvz')}{rng.choice('aeiou')}{i:x}qx" for i in range(extra)})
+    easy = data["easy"] + words[0::3]
+    hard = data["hard"] + words[1::3]
+    tips = {**data["tips"], **{w: f"tip for {w}" for w in words[2::3]}}
+    return easy, hard, tips, data["default_tip"]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[35, 1000, 10000])
+    parser.add_argument('--vocab', type=int, nargs='+', default=[0, 5000])
+    args = parser.parse_args()
+
+    print(f"{'keywords':>9} {'topics':>7} {'automaton':>11} {'in-scans':>11}  same result")
+    for extra in args.vocab:
+        easy, hard, tips, default_tip = keyword_tables(extra)
+        classifier = TopicClassifier(easy, hard, tips, default_tip)
+        for n in args.sizes:
+            topics = syllabus_topics(n)
+            got, fast = timed(lambda: classifier.classify_all(topics))
+            expected, slow = timed(lambda: legacy_classify(topics, easy, hard, tips, default_tip))
+            same = [(r["difficulty"], r["tip"]) for r in got] == expected
+            print(f"{len(classifier.matcher.keywords):>9} {n:>7} {fast * 1000:>9.1f}ms {slow * 1000:>9.1f}ms  {same}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark for dependency graph construction at 100 / 1k / 5k / 10k topics.
+
+    python benchmarks/bench_dependencies.py [--sizes 100 1000 5000 10000] [--python-max 5000]
+
+Times the TF-IDF top-k graph with the NumPy/SciPy sparse path and with the
+pure-Python inverted index (DEPENDENCY_VECTORS=python), and checks that both
+build the same graph wherever the Python path is run. study_order is checked
+too: every edge is respected, and without difficulty (all edges point forward)
+the topics come back in syllabus order.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+import dependencies  # noqa: E402
+from dependencies import dependency_adjacency, study_order  # noqa: E402
+
+VOCAB_SIZE = 3000
+
+
+def synthetic_topics(n, seed=11):
+    # Zipf-ish vocabulary: a few very common words, a long tail of rare ones
+    rng = random.Random(seed)
+    vocab = [f"term{i}" for i in range(VOCAB_SIZE)]
+    weights = [1 / (i + 1) for i in range(VOCAB_SIZE)]
+    topics = []
+    for i in range(n):
+        words = rng.choices(vocab, weights, k=rng.randint(2, 5))
+        topics.append(" ".join(words) + f" {i}")
+    return topics
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def python_adjacency(topics, difficulty):
+    previous = os.environ.get('DEPENDENCY_VECTORS')
+    os.environ['DEPENDENCY_VECTORS'] = 'python'
+    try:
+        return dependency_adjacency(topics, sequential=False, difficulty=difficulty)
+    finally:
+        if previous is None:
+            del os.environ['DEPENDENCY_VECTORS']
+        else:
+            os.environ['DEPENDENCY_VECTORS'] = previous
+
+
+def order_ok(adjacency, forward):
+    """study_order respects every edge outside a cycle; forward-only graphs keep syllabus order."""
+    order, cycles = study_order(adjacency)
+    if forward:
+        return order == list(range(len(adjacency)))
+    position = {node: i for i, node in enumerate(order)}
+    in_cycle = {node for cycle in cycles for node in cycle}
+    return all(position[u] < position[v] for u, edges in enumerate(adjacency) for v in edges
+               if not (u in in_cycle and v in in_cycle))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 5000, 10000])
+    parser.add_argument('--python-max', type=int, default=5000,
+                        help='skip the pure-Python path above this many topics')
+    args = parser.parse_args()
+
+    sparse = dependencies._numeric_modules() is not None
+    if not sparse:
+        print("numpy/scipy not installed: both columns use the pure-Python path")
+    print(f"{'topics':>8} {'edges':>9} {'sparse':>11} {'python':>11}  same graph  order ok")
+    for n in args.sizes:
+        topics = synthetic_topics(n)
+        difficulty = [random.Random(i).randint(1, 3) for i in range(n)]
+        adjacency, fast = timed(lambda: dependency_adjacency(topics, sequential=False, difficulty=difficulty))
+        edges = sum(len(e) for e in adjacency)
+        ordered = order_ok(adjacency, False) and order_ok(dependency_adjacency(topics, sequential=False), True)
+        if n <= args.python_max:
+            expected, slow = timed(lambda: python_adjacency(topics, difficulty))
+            print(f"{n:>8} {edges:>9} {fast * 1000:>9.1f}ms {slow * 1000:>9.1f}ms  {str(adjacency == expected):>10}"
+                  f"  {ordered}")
+        else:
+            print(f"{n:>8} {edges:>9} {fast * 1000:>9.1f}ms {'-':>11}  {'-':>10}  {ordered}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Cold-start cost of the API: how long `import index` takes in a fresh interpreter,
+and which heavy modules the first /api/health and /api/chat requests pull in.
+
+    python benchmarks/bench_imports.py [--repeat 10]
+
+Each sample is a new subprocess, so nothing is shared between runs. Flask's own
+import time is reported separately; it is paid by every route and is not ours to save.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+API_DIR = os.path.join(HERE, '..', 'api')
+
+# Modules that only the analyze / jobs / Gemini paths should load
+HEAVY_MODULES = ["pypdf", "google.generativeai", "dotenv", "sqlite3", "multiprocessing",
+                 "concurrent.futures.process"]
+
+PROBE = r"""
+import json, os, sys, time
+sys.path.insert(0, sys.argv[1])
+os.environ.pop('GEMINI_API_KEY', None)
+heavy = json.loads(sys.argv[2])
+start = time.perf_counter()
+import flask, flask_cors
+flask_ms = (time.perf_counter() - start) * 1000
+import index
+import_ms = (time.perf_counter() - start) * 1000
+loaded = {"import": [m for m in heavy if m in sys.modules]}
+client = index.app.test_client()
+start = time.perf_counter()
+client.get('/api/health')
+health_ms = (time.perf_counter() - start) * 1000
+loaded["health"] = [m for m in heavy if m in sys.modules]
+start = time.perf_counter()
+client.post('/api/chat', json={"topic": "Search", "message": "hi"})
+chat_ms = (time.perf_counter() - start) * 1000
+loaded["chat"] = [m for m in heavy if m in sys.modules]
+print(json.dumps({"flask_ms": flask_ms, "import_ms": import_ms, "health_ms": health_ms,
+                  "chat_ms": chat_ms, "loaded": loaded}))
+"""
+
+
+def sample():
+    out = subprocess.run([sys.executable, '-c', PROBE, API_DIR, json.dumps(HEAVY_MODULES)],
+                         capture_output=True, text=True, check=True, cwd=API_DIR)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    samples = [sample() for _ in range(args.repeat)]
+    print(f"median of {args.repeat} fresh interpreters, ms")
+    for name in ("flask_ms", "import_ms", "health_ms", "chat_ms"):
+        print(f"  {name[:-3]:12s} {statistics.median(s[name] for s in samples):8.1f}")
+    own = statistics.median(s["import_ms"] - s["flask_ms"] for s in samples)
+    print(f"  {'index - flask':12s} {own:8.1f}")
+    for stage, modules in samples[-1]["loaded"].items():
+        print(f"heavy modules after {stage:6s}: {', '.join(modules) or '-'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Micro-benchmark for topic cleaning: lines per second on a synthetic 10k-line syllabus.
+
+    python benchmarks/bench_normalizer.py [--lines 10000] [--repeat 10]
+
+Compares TopicNormalizer against the per-line re.sub loop identify_topics used before.
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+from normalizer import TopicNormalizer, topic_lines  # noqa: E402
+
+WORDS = ["search", "heuristic", "neural", "networks", "gradient", "descent", "bayesian", "inference",
+         "logic", "planning", "agents", "optimization", "learning", "graphs", "probability", "games"]
+PREFIXES = ["", "UNIT {n}: ", "{n}. ", "{n}.{m} ", "- ", "• ", "MODULE {n} ", "IV. ", "CS{n}{m}01 "]
+SUFFIXES = ["", " Notes", " Syllabus", " Question Bank", ""]
+
+
+def synthetic_lines(n, seed=7):
+    rng = random.Random(seed)
+    lines = []
+    for i in range(n):
+        title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 5)))
+        prefix = rng.choice(PREFIXES).format(n=i % 9 + 1, m=i % 7)
+        line = prefix + title.capitalize() + rng.choice(SUFFIXES)
+        if i % 5 == 0:
+            line = line.lower()  # body text, not a heading
+        lines.append(line)
+    return lines
+
+
+def legacy_fallback(text):
+    topics, seen = [], set()
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line or len(line) < 5: continue
+        if (re.match(r'^(UNIT|MODULE|CHAPTER|TOPIC|SECTION)\s', line, re.IGNORECASE) or
+            re.match(r'^[\d\.\-\*\•]+\s+[A-Z]', line) or
+            (line[0].isupper() and len(line) < 80)):
+            t = re.sub(r'^[\d\.\-\*\•\s]+', '', line).strip()
+            t = re.sub(r'^(UNIT|MODULE|CHAPTER|TOPIC|SECTION)\s*[\d\.\-\:]*\s*', '', t, flags=re.IGNORECASE)
+            t = re.sub(r'[A-Z]{2,}\d{3,}[A-Z]*', '', t).strip()
+            cleaned = t.capitalize()
+            if cleaned and cleaned not in seen and len(cleaned) > 2:
+                topics.append(cleaned)
+                seen.add(cleaned)
+    return topics
+
+
+def legacy_model_cleanup(topics, subject_name):
+    # Same steps as before, with flags passed explicitly: inline (?i) after ^ is an error on 3.11+
+    cleaned = []
+    for t in topics:
+        t = str(t).strip()
+        t = re.sub(r'^(UNIT|MODULE|CHAPTER|TOPIC|SECTION|PART|LESSON|ROMAN|WEEK|SESSION)\s*[\d\.\-\:]*', '', t, flags=re.I).strip()
+        t = re.sub(r'^(IX|IV|V?I{0,3})\s*[\d\.\-\:]*', '', t, flags=re.I).strip()
+        if subject_name and len(subject_name) > 3:
+            t = re.sub(re.escape(subject_name), '', t, flags=re.IGNORECASE).strip()
+        t = re.sub(r'\s*(Syllabus|Notes|Course|University|Credit|Instructor|Hours|Question Bank|Extra Questions|Important Questions|Question Paper|Objective|Summary|Module|Unit|Chapter|Topic)\s*$', '', t, flags=re.I).strip()
+        t = re.sub(r'^[^a-zA-Z0-9]+', '', t).strip()
+        t = re.sub(r'\s+', ' ', t).strip()
+        lower_t = t.lower()
+        if (t and len(t) > 3 and
+            not any(noise in lower_t for noise in ["you said", "here are", "identified", "topics", "content of", "syllabus for"])):
+            cleaned.append(t.capitalize())
+    return list(dict.fromkeys(cleaned))
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--lines', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    lines = synthetic_lines(args.lines)
+    text = "\n".join(lines)
+    subject = "artificial intelligence"
+
+    cases = [
+        ("fallback / legacy", lambda: legacy_fallback(text)),
+        ("fallback / TopicNormalizer", lambda: TopicNormalizer(drop_chatter=False, min_length=3).normalize(topic_lines(text))),
+        ("model output / legacy", lambda: legacy_model_cleanup(lines, subject)),
+        ("model output / TopicNormalizer", lambda: TopicNormalizer(subject).normalize(lines)),
+    ]
+    print(f"{args.lines} lines, best of {args.repeat}")
+    for name, fn in cases:
+        elapsed = best_of(fn, args.repeat)
+        print(f"  {name:32s} {elapsed * 1000:8.1f} ms  {args.lines / elapsed:12,.0f} lines/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+"""
+Reproducible benchmark for the analyze pipeline, stage by stage and end to end.
+
+    python benchmarks/bench_pipeline.py [--sizes 10 100 1000 5000] [--repeat 5]
+                                        [--llm-latency 0.0] [--json out.json]
+                                        [--compare baseline.json]
+
+Syllabi are synthetic (benchmarks/synthetic.py) and Gemini is replaced by a local
+stand-in (benchmarks/fake_gemini.py), so runs need no network and are comparable
+between machines and revisions. Stage timings take the topic list of the requested size
+directly; identify_topics and the end-to-end request go through the real code
+paths, whose own topic caps apply.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', 'api'))
+sys.path.insert(0, HERE)
+
+# Every end-to-end run must do the full work
+os.environ['ANALYSIS_CACHE'] = '0'
+os.environ['CHAT_CACHE'] = '0'
+
+from fake_gemini import FakeGenerativeModel  # noqa: E402
+from synthetic import syllabus_pdf, syllabus_text, syllabus_topics  # noqa: E402
+
+
+def time_runs(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {"min_ms": round(min(samples), 3), "median_ms": round(statistics.median(samples), 3), "runs": repeat}
+
+
+def bench_size(index, gemini, n, repeat, llm_latency, workdir):
+    topics = syllabus_topics(n)
+    text = syllabus_text(n)
+    pdf = syllabus_pdf(n)
+    pdf_path = os.path.join(workdir, f"syllabus_{n}.pdf")
+    with open(pdf_path, 'wb') as f:
+        f.write(pdf)
+    cleaned = index.clean_text(text)
+    fake = FakeGenerativeModel(topics, latency=llm_latency)
+
+    graph = index.analyze_dependencies(topics)
+    order = index.get_study_order(graph)
+    details = index.classify_topics_fully(order)
+
+    def identify_llm():
+        gemini.registry.override(fake)
+        try:
+            index.identify_topics(cleaned)
+        finally:
+            gemini.registry.reset()
+
+    def identify_fallback():
+        gemini.registry.reset()
+        index.identify_topics(cleaned)
+
+    client = index.app.test_client()
+
+    def end_to_end():
+        gemini.registry.override(fake)
+        try:
+            with open(pdf_path, 'rb') as f:
+                response = client.post('/api/analyze', data={'file': (f, 'syllabus.pdf'), 'weeks': '12'},
+                                       content_type='multipart/form-data')
+            assert response.status_code == 200, response.get_data(as_text=True)[:200]
+        finally:
+            gemini.registry.reset()
+
+    stages = {
+        "extract_text_from_pdf": lambda: index.extract_text_from_pdf(pdf_path),
+        "clean_text": lambda: index.clean_text(text),
+        "identify_topics_llm": identify_llm,
+        "identify_topics_fallback": identify_fallback,
+        "analyze_dependencies": lambda: index.analyze_dependencies(topics),
+        "get_study_order": lambda: index.get_study_order(graph),
+        "classify_topics_fully": lambda: index.classify_topics_fully(order),
+        "generate_schedule": lambda: index.generate_schedule(order, details, 12, 10, "Intermediate"),
+        "end_to_end": end_to_end,
+    }
+    results = {"pdf_bytes": len(pdf), "text_chars": len(text)}
+    for name, fn in stages.items():
+        results[name] = time_runs(fn, repeat)
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, baseline, threshold):
+    print(f"\nvs baseline ({baseline['meta'].get('git_revision')}), median ms, regression threshold {threshold:.2f}x")
+    regressions = 0
+    for size, stages in current["results"].items():
+        base_stages = baseline["results"].get(size, {})
+        for stage, timing in stages.items():
+            if not isinstance(timing, dict) or stage not in base_stages:
+                continue
+            before, after = base_stages[stage]["median_ms"], timing["median_ms"]
+            ratio = after / before if before else float('inf')
+            flag = "  REGRESSION" if ratio > threshold and after - before > 0.5 else ""
+            regressions += bool(flag)
+            print(f"  {size:>6} {stage:26s} {before:10.2f} -> {after:10.2f}  {ratio:5.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 5000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--llm-latency', type=float, default=0.0,
+                        help='seconds the fake Gemini model sleeps per call')
+    parser.add_argument('--json', help='write results to this file')
+    parser.add_argument('--compare', help='baseline JSON from an earlier run')
+    parser.add_argument('--threshold', type=float, default=1.2)
+    args = parser.parse_args()
+
+    import index  # after the env overrides above
+    import gemini
+
+    workdir = tempfile.mkdtemp(prefix='studyflow-bench-')
+    index.app.logger.disabled = True
+
+    report = {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(),
+                 "git_revision": git_revision(), "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S'),
+                 "repeat": args.repeat, "llm_latency": args.llm_latency},
+        "results": {},
+    }
+    for n in args.sizes:
+        # The pipeline's progress prints would swamp the table
+        stdout, sys.stdout = sys.stdout, open(os.devnull, 'w')
+        try:
+            report["results"][str(n)] = bench_size(index, gemini, n, args.repeat, args.llm_latency, workdir)
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+        print(f"\n{n} topics ({report['results'][str(n)]['pdf_bytes']:,} byte PDF), min / median ms")
+        for stage, timing in report["results"][str(n)].items():
+            if isinstance(timing, dict):
+                print(f"  {stage:26s} {timing['min_ms']:10.2f} {timing['median_ms']:10.2f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nwrote {args.json}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark for schedule packing at up to thousands of topics and multi-semester horizons.
+
+    python benchmarks/bench_schedule.py [--sizes 30 1000 5000] [--weeks 4 16 104] [--dp-max 300]
+
+The binary-search partition is checked against the O(k n^2) linear-partition DP
+(same heaviest week) wherever the DP is still affordable, and against the old
+greedy week filling for balance.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+from scheduler import build_schedule, min_max_partition, topic_hours  # noqa: E402
+
+
+def synthetic_details(n, seed=5):
+    rng = random.Random(seed)
+    topics = [f"topic {i}" for i in range(n)]
+    return topics, {t: {"difficulty": rng.choice([1, 2, 2, 3])} for t in topics}
+
+
+def linear_partition_dp(weights, k):
+    """Heaviest block of the optimal k-way contiguous split, by dynamic programming."""
+    n = len(weights)
+    k = min(k, n)
+    prefix = [0.0]
+    for w in weights:
+        prefix.append(prefix[-1] + w)
+    best = [prefix[i] for i in range(n + 1)]  # one block
+    for _ in range(2, k + 1):
+        best = [0.0] + [min(max(best[j], prefix[i] - prefix[j]) for j in range(i)) for i in range(1, n + 1)]
+    return best[n]
+
+
+def legacy_heaviest(weights, weeks):
+    total = sum(weights) or 1
+    per_week = total / weeks
+    loads, curr, w_num = [], 0, 1
+    for w in weights:
+        curr += w
+        if curr >= per_week and w_num < weeks:
+            loads.append(curr)
+            curr, w_num = 0, w_num + 1
+    if curr:
+        if w_num > weeks:
+            loads[-1] += curr
+        else:
+            loads.append(curr)
+    return max(loads)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[30, 1000, 5000])
+    parser.add_argument('--weeks', type=int, nargs='+', default=[4, 16, 104])
+    parser.add_argument('--dp-max', type=int, default=300, help='skip the DP check above this many topics')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'topics':>7} {'weeks':>6} {'packing':>10} {'heaviest':>9} {'greedy':>8} {'dp':>8}")
+    for n in args.sizes:
+        topics, details = synthetic_details(n)
+        weights = topic_hours(topics, details, "Beginner")
+        for weeks in args.weeks:
+            samples = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                build_schedule(topics, details, weeks, 0, "Beginner")
+                samples.append(time.perf_counter() - start)
+            _, heaviest = min_max_partition(weights, weeks)
+            dp = f"{linear_partition_dp(weights, weeks):8.1f}" if n <= args.dp_max else f"{'-':>8}"
+            print(f"{n:>7} {weeks:>6} {min(samples) * 1000:>8.2f}ms {heaviest:>9.1f} "
+                  f"{legacy_heaviest(weights, weeks):>8.1f} {dp}")
+
+
+if __name__ == '__main__':
+    main()
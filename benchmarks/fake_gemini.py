@@ -0,0 +1,49 @@
+"""
+Local stand-in for google.generativeai.GenerativeModel with configurable latency.
+
+Topic prompts get canned JSON in the shape the request asked for ({subject, topics}
+for the single-call mode, a bare array for the two-call mode, {topics: [{title, subtopics}]}
+for unit expansion), subject prompts get
+the subject name, anything else gets a short mentor reply.
+"""
+import json
+import time
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    def __init__(self, topics, subject="Artificial Intelligence", latency=0.0, chunk_latency=0.0):
+        self.topics = list(topics)
+        self.subject = subject
+        self.latency = latency
+        self.chunk_latency = chunk_latency
+        self.calls = 0
+
+    def _reply(self, prompt, generation_config=None):
+        if generation_config and generation_config.get("response_mime_type") == "application/json":
+            if '"subtopics"' in prompt:
+                return json.dumps({"topics": [{"title": t, "subtopics": [f"{t} basics", f"{t} in practice"]}
+                                              for t in self.topics[:6]]})
+            return json.dumps({"subject": self.subject, "topics": self.topics})
+        if "JSON array" in prompt:
+            return "```json\n" + json.dumps(self.topics) + "\n```"
+        if "subject name" in prompt:
+            return self.subject
+        return "Break the idea into small steps and try one worked example before the exercises."
+
+    def generate_content(self, prompt, generation_config=None, stream=False, **kwargs):
+        self.calls += 1
+        time.sleep(self.latency)
+        text = self._reply(prompt, generation_config)
+        if not stream:
+            return FakeResponse(text)
+        return self._stream(text)
+
+    def _stream(self, text):
+        for word in text.split(" "):
+            time.sleep(self.chunk_latency)
+            yield FakeResponse(word + " ")
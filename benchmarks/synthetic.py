@@ -0,0 +1,82 @@
+"""
+Synthetic syllabi for benchmarks: a deterministic topic list plus the same
+content rendered as plain text and as a (minimal, text-only) PDF.
+"""
+import random
+
+SUBJECT = "Artificial Intelligence"
+UNIT_NAMES = ["Foundations", "Search Strategies", "Knowledge Representation", "Probabilistic Reasoning",
+              "Machine Learning", "Neural Networks", "Planning", "Natural Language Processing",
+              "Computer Vision", "Reinforcement Learning"]
+HEADS = ["Introduction to", "Basics of", "Advanced", "Applications of", "Overview of", "Heuristic",
+         "Bayesian", "Deep", "Optimization of", "Inference in", "Logic for", "Complex"]
+CONCEPTS = ["search algorithms", "gradient descent", "backpropagation", "decision trees", "markov models",
+            "constraint satisfaction", "adversarial games", "knowledge graphs", "first order logic",
+            "belief networks", "convolutional layers", "policy iteration", "word embeddings",
+            "support vector machines", "clustering methods", "feature extraction", "planning graphs",
+            "value functions", "attention mechanisms", "probabilistic inference"]
+TOPICS_PER_UNIT = 8
+LINES_PER_PAGE = 45
+
+
+def syllabus_topics(n, seed=42):
+    """n distinct topic titles, grouped into units of TOPICS_PER_UNIT."""
+    rng = random.Random(seed)
+    topics = []
+    seen = set()
+    while len(topics) < n:
+        title = f"{rng.choice(HEADS)} {rng.choice(CONCEPTS)}"
+        if title in seen:
+            title = f"{title} {len(topics) // len(CONCEPTS) + 2}"
+        if title in seen:
+            continue
+        seen.add(title)
+        topics.append(title)
+    return topics
+
+
+def syllabus_lines(topics):
+    lines = [f"{SUBJECT} - Course Syllabus", "Course code: CS3491  Credits: 4"]
+    for start in range(0, len(topics), TOPICS_PER_UNIT):
+        unit = start // TOPICS_PER_UNIT
+        lines.append(f"UNIT {unit + 1}: {UNIT_NAMES[unit % len(UNIT_NAMES)]}")
+        for k, topic in enumerate(topics[start:start + TOPICS_PER_UNIT]):
+            lines.append(f"{unit + 1}.{k + 1} {topic}")
+            lines.append(f"students study {topic.lower()} with worked examples and exercises.")
+    return lines
+
+
+def syllabus_text(n, seed=42):
+    return "\n".join(syllabus_lines(syllabus_topics(n, seed))) + "\n"
+
+
+def _pdf_escape(line):
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def syllabus_pdf(n, seed=42):
+    """The text syllabus laid out over as many Helvetica pages as it needs."""
+    lines = syllabus_lines(syllabus_topics(n, seed))
+    pages = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)]
+
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>"]
+    kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(len(pages)))
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>")
+    font_id = 3 + 2 * len(pages)
+    for i, page in enumerate(pages):
+        content = "BT /F1 10 Tf 14 TL 40 780 Td " + " ".join(f"({_pdf_escape(l)}) Tj T*" for l in page) + " ET"
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {4 + 2 * i} 0 R "
+                       f"/Resources << /Font << /F1 {font_id} 0 R >> >> >>")
+        objects.append(f"<< /Length {len(content)} >>\nstream\n{content}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = "%PDF-1.4\n"
+    offsets = []
+    for i, obj in enumerate(objects):
+        offsets.append(len(out))
+        out += f"{i + 1} 0 obj\n{obj}\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n"
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    return out.encode('latin-1')
@@ -22,6 +22,38 @@ const SOUNDS = {
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || '';
 
+// Tips and links that compact responses reference by id; fetched once per catalog version
+// (the versioned URL is cached for good by the browser and the edge)
+const catalogs = {};
+const loadCatalog = (version) => {
+  catalogs[version] = catalogs[version] || axios.get(`${API_BASE_URL}/api/catalog?v=${version}`)
+    .then(r => r.data, (err) => { delete catalogs[version]; throw err; });
+  return catalogs[version];
+};
+
+// /api/analyze?format=compact sends each topic once; rebuild the shape the dashboard reads
+const expandCompact = async (data) => {
+  if (data.format !== 'compact') return data;
+  const catalog = await loadCatalog(data.catalog);
+  const { topics } = data;
+  const names = (ids) => ids.map(i => topics[i]);
+  const resources = (topic, id) => [
+    ...(catalog.curated[id] || []),
+    ...catalog.templates.map(r => ({ name: r.name, url: r.url.replace('{query}', topic.split(' ').join('+')) }))
+  ];
+  return {
+    ...data,
+    topic_details: Object.fromEntries(topics.map((t, i) => [t, { difficulty: data.difficulty[i], advice: catalog.tips[data.advice[i]], keywords: data.keywords[i].map(k => data.vocabulary[k]), resources: resources(t, data.resources[i]) }])),
+    schedule: data.schedule.map(w => ({ ...w, topics: names(w.topics) })),
+    overflow: data.overflow && { ...data.overflow, topics: names(data.overflow.topics) },
+    graph: {
+      nodes: topics.map((t, i) => ({ id: t, group: data.difficulty[i] })),
+      links: data.graph.links.map(([s, t, c]) => ({ source: topics[s], target: topics[t], cycle: c === 1 })),
+      cycles: data.graph.cycles.map(names)
+    }
+  };
+};
+
 const ChatAssistant = ({ topic }) => {
   const [messages, setMessages] = useState([
     { role: 'assistant', content: `Hello! I'm your AI Study Assistant. Do you have any specific doubts about "${topic}"?` }
@@ -37,15 +69,34 @@ const ChatAssistant = ({ topic }) => {
     setInput('');
 
     try {
-      const resp = await axios.post(`${API_BASE_URL}/api/chat`, {
-        topic: topic,
-        message: input
+      // Stream the reply so the first words show up as soon as the mentor starts answering
+      const resp = await fetch(`${API_BASE_URL}/api/chat/stream`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ topic: topic, message: input })
       });
-
-      setMessages(prev => [...prev, {
-        role: 'assistant',
-        content: resp.data.response
-      }]);
+      if (!resp.ok || !resp.body) throw new Error(`HTTP ${resp.status}`);
+
+      setMessages(prev => [...prev, { role: 'assistant', content: '' }]);
+      const reader = resp.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split('\n\n');
+        buffer = events.pop();
+        for (const evt of events) {
+          const dataLine = evt.split('\n').find(l => l.startsWith('data: '));
+          if (!dataLine || evt.startsWith('event: done')) continue;
+          const { text } = JSON.parse(dataLine.slice(6));
+          setMessages(prev => {
+            const last = prev[prev.length - 1];
+            return [...prev.slice(0, -1), { ...last, content: last.content + text }];
+          });
+        }
+      }
     } catch (err) {
       setMessages(prev => [...prev, {
         role: 'assistant',
@@ -170,8 +221,8 @@ const App = () => {
     formData.append('level', config.level);
 
     try {
-      const resp = await axios.post(`${API_BASE_URL}/api/analyze`, formData);
-      setResult(resp.data);
+      const resp = await axios.post(`${API_BASE_URL}/api/analyze?format=compact`, formData);
+      setResult(await expandCompact(resp.data));
       playSound('success');
     } catch (err) {
       console.error(err);
@@ -185,6 +236,30 @@ const App = () => {
     }
   };
 
+  // Re-plan from the stored analysis (or the topics we already have) without re-uploading
+  const handleReplan = async () => {
+    if (!result) return;
+    setLoading(true);
+    try {
+      const resp = await axios.post(`${API_BASE_URL}/api/schedule`, {
+        analysis_id: result.analysis_id,
+        topics: result.topics,
+        topic_details: result.topic_details,
+        weeks: config.weeks,
+        hours: config.hours,
+        level: config.level,
+        completed: completedTopics
+      });
+      setResult({ ...result, ...resp.data });
+      playSound('success');
+    } catch (err) {
+      console.error(err);
+      alert(`Error: ${err.response?.data?.error || "Re-planning failed."}`);
+    } finally {
+      setLoading(false);
+    }
+  };
+
   const handleReset = () => {
     setResult(null);
     setFile(null);
@@ -202,13 +277,18 @@ const App = () => {
 
   const downloadRoadmap = () => {
     if (!result) return;
+    const roadmapLine = t => `- [ ] ${t} (${result.topic_details[t].difficulty === 1 ? 'Focus' : 'Elite'})\n    Advice: ${result.topic_details[t].advice}`;
     const content = `STUDYFLOW AI ROADMAP\n===================\n\n` +
       `Duration: ${config.weeks} Weeks\n` +
       `Level: ${config.level}\n\n` +
       result.schedule.map(w => (
         `WEEK ${w.week}\n` +
-        w.topics.map(t => `- [ ] ${t} (${result.topic_details[t].difficulty === 1 ? 'Focus' : 'Elite'})\n    Advice: ${result.topic_details[t].advice}`).join('\n')
-      )).join('\n\n');
+        w.topics.map(roadmapLine).join('\n')
+      )).join('\n\n') +
+      (result.overflow
+        ? `\n\nEXTRA WEEKS (~${result.overflow.hours}h over ${result.overflow.extra_weeks} more week(s) at ${config.hours}h/week)\n` +
+          result.overflow.topics.map(roadmapLine).join('\n')
+        : '');
 
     const blob = new Blob([content], { type: 'text/plain' });
     const url = URL.createObjectURL(blob);
@@ -356,9 +436,14 @@ const App = () => {
                     <p style={{ color: 'var(--text-muted)' }}>{result.mentor_summary}</p>
                   </div>
                 </div>
-                <button onClick={downloadRoadmap} className="btn-primary" style={{ padding: '0.75rem 1.5rem', fontSize: '0.9rem', display: 'flex', alignItems: 'center', gap: '0.5rem' }}>
-                  <Download size={18} /> Download
-                </button>
+                <div style={{ display: 'flex', gap: '0.75rem' }}>
+                  <button onClick={handleReplan} disabled={loading} className="btn-primary" style={{ padding: '0.75rem 1.5rem', fontSize: '0.9rem', display: 'flex', alignItems: 'center', gap: '0.5rem' }}>
+                    <Calendar size={18} /> Re-plan remaining
+                  </button>
+                  <button onClick={downloadRoadmap} className="btn-primary" style={{ padding: '0.75rem 1.5rem', fontSize: '0.9rem', display: 'flex', alignItems: 'center', gap: '0.5rem' }}>
+                    <Download size={18} /> Download
+                  </button>
+                </div>
               </motion.div>
 
               <div className="grid" style={{ gridTemplateColumns: '1fr 1.5fr' }}>
@@ -488,6 +573,37 @@ const App = () => {
                       </div>
                     </motion.div>
                   ))}
+                  {result.overflow && (
+                    <motion.div
+                      variants={{
+                        hidden: { opacity: 0, scale: 0.9, y: 20 },
+                        visible: { opacity: 1, scale: 1, y: 0 }
+                      }}
+                      whileHover={{ translateY: -5 }}
+                      style={{ padding: '2rem', borderRadius: '2rem', background: 'var(--badge-bg)', border: '1px dashed #f87171', display: 'flex', flexDirection: 'column', height: '100%' }}>
+                      <div style={{ display: 'flex', justifyContent: 'space-between', alignItems: 'center', marginBottom: '0.5rem' }}>
+                        <h4 style={{ color: '#f87171', fontSize: '1.3rem' }}>Extra Weeks</h4>
+                        <div style={{ background: 'rgba(248, 113, 113, 0.1)', padding: '0.25rem 0.75rem', borderRadius: '8px', fontSize: '0.7rem', color: '#f87171', fontWeight: 600 }}>
+                          +{result.overflow.extra_weeks} WEEKS
+                        </div>
+                      </div>
+                      <p style={{ fontSize: '0.8rem', opacity: 0.7, marginBottom: '1.5rem' }}>
+                        ~{result.overflow.hours}h that don't fit in {config.hours}h/week
+                      </p>
+                      <div style={{ flex: 1, display: 'flex', flexDirection: 'column', gap: '1rem' }}>
+                        {result.overflow.topics.map((t, ti) => (
+                          <div
+                            key={ti}
+                            style={{ fontSize: '0.9rem', display: 'flex', gap: '0.75rem', alignItems: 'flex-start', padding: '0.5rem', borderRadius: '8px', cursor: 'help' }}
+                            title={result.topic_details[t].advice}
+                          >
+                            <Clock size={18} color="#f87171" style={{ flexShrink: 0, marginTop: '2px' }} />
+                            <span style={{ fontWeight: 500 }}>{t}</span>
+                          </div>
+                        ))}
+                      </div>
+                    </motion.div>
+                  )}
                 </motion.div>
               </motion.div>
 